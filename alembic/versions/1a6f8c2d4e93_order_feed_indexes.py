@@ -0,0 +1,42 @@
+"""order_feed_indexes
+
+Revision ID: 1a6f8c2d4e93
+Revises: e5b7d3a90f12
+Create Date: 2026-10-18 13:15:36.207751
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a6f8c2d4e93'
+down_revision: Union[str, Sequence[str], None] = 'e5b7d3a90f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.drop_index('ix_orders_user_id', table_name='orders')
+    op.drop_index('ix_orders_price', table_name='orders')
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_orders_created_at', 'orders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_orders_begin_time', 'orders', ['begin_time', 'id'], unique=False)
+    op.create_index('ix_orders_price', 'orders', ['price', 'id'], unique=False)
+    op.create_index('ix_orders_end_time', 'orders', ['end_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_end_time', table_name='orders')
+    op.drop_index('ix_orders_price', table_name='orders')
+    op.drop_index('ix_orders_begin_time', table_name='orders')
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
+    op.create_index('ix_orders_price', 'orders', ['price'], unique=False)
+    op.create_index('ix_orders_user_id', 'orders', ['user_id'], unique=False)
+    op.drop_column('orders', 'created_at')
@@ -0,0 +1,44 @@
+"""refresh_token_hash
+
+Revision ID: 3f1c9a7e2b64
+Revises: a5bfa6b05b31
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e2b64'
+down_revision: Union[str, Sequence[str], None] = 'a5bfa6b05b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+    # Мертвые строки переносить незачем
+    op.execute("DELETE FROM refresh_tokens WHERE revoked OR expires_at < now()")
+    op.execute("UPDATE refresh_tokens SET token_hash = sha256(convert_to(token, 'UTF8'))")
+    op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+    op.drop_constraint(op.f('refresh_tokens_token_key'), 'refresh_tokens', type_='unique')
+    op.drop_column('refresh_tokens', 'token')
+    op.create_unique_constraint(op.f('refresh_tokens_token_hash_key'), 'refresh_tokens', ['token_hash'])
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_refresh_tokens_revoked', 'refresh_tokens', ['id'], unique=False, postgresql_where=sa.text('revoked'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Исходные токены по хэшу не восстановить: все сессии придется открыть заново
+    op.drop_index('ix_refresh_tokens_revoked', table_name='refresh_tokens', postgresql_where=sa.text('revoked'))
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.drop_constraint(op.f('refresh_tokens_token_hash_key'), 'refresh_tokens', type_='unique')
+    op.execute("DELETE FROM refresh_tokens")
+    op.drop_column('refresh_tokens', 'token_hash')
+    op.add_column('refresh_tokens', sa.Column('token', sa.String(length=512), nullable=False))
+    op.create_unique_constraint(op.f('refresh_tokens_token_key'), 'refresh_tokens', ['token'])
@@ -0,0 +1,32 @@
+"""row_versions
+
+Revision ID: 4c9d2e7f1b58
+Revises: 8b0e5f7a3c21
+Create Date: 2026-10-18 14:41:07.203114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c9d2e7f1b58'
+down_revision: Union[str, Sequence[str], None] = '8b0e5f7a3c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('orders', 'users'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('users', 'orders'):
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
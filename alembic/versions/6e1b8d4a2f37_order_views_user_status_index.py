@@ -0,0 +1,28 @@
+"""order_views_user_status_index
+
+Revision ID: 6e1b8d4a2f37
+Revises: d7a3f5c2e816
+Create Date: 2026-10-18 15:31:52.094716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1b8d4a2f37'
+down_revision: Union[str, Sequence[str], None] = 'd7a3f5c2e816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_order_views_user_id_status', 'order_views', ['user_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_views_user_id_status', table_name='order_views')
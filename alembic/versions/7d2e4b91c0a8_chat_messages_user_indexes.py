@@ -0,0 +1,30 @@
+"""chat_messages_user_indexes
+
+Revision ID: 7d2e4b91c0a8
+Revises: 3f1c9a7e2b64
+Create Date: 2026-10-18 11:03:27.184402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b91c0a8'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7e2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_chat_messages_sender_id_created_at', 'chat_messages', ['sender_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_messages_recipient_id_created_at', 'chat_messages', ['recipient_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_messages_recipient_id_created_at', table_name='chat_messages')
+    op.drop_index('ix_chat_messages_sender_id_created_at', table_name='chat_messages')
@@ -0,0 +1,42 @@
+"""order_search_vector
+
+Revision ID: 8b0e5f7a3c21
+Revises: 1a6f8c2d4e93
+Create Date: 2026-10-18 14:02:18.775390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b0e5f7a3c21'
+down_revision: Union[str, Sequence[str], None] = '1a6f8c2d4e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Сгенерированная колонка пересчитывается базой при любом изменении заказа
+    op.add_column('orders', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+            "setweight(to_tsvector('russian', coalesce(address, '')), 'C')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('ix_orders_search_vector', 'orders', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_search_vector', table_name='orders', postgresql_using='gin')
+    op.drop_column('orders', 'search_vector')
@@ -0,0 +1,46 @@
+"""image_refs
+
+Revision ID: b2f9c6e13a40
+Revises: 6e1b8d4a2f37
+Create Date: 2026-10-18 16:12:30.661358
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f9c6e13a40'
+down_revision: Union[str, Sequence[str], None] = '6e1b8d4a2f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('image_refs',
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('refcount', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('filename')
+    )
+    # Счетчики по уже сохраненным ссылкам; IMAGE_BASE_URL по умолчанию
+    op.execute("""
+        INSERT INTO image_refs (filename, refcount)
+        SELECT regexp_replace(url, '^.*/', ''), count(*)
+        FROM (
+            SELECT image_url AS url FROM users
+            UNION ALL SELECT image_url FROM orders
+            UNION ALL SELECT logo_url FROM orders
+            UNION ALL SELECT image_url FROM orders_archive
+            UNION ALL SELECT logo_url FROM orders_archive
+        ) urls
+        WHERE strpos(url, '/storage/images') > 0
+        GROUP BY 1
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('image_refs')
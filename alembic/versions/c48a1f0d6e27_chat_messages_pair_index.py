@@ -0,0 +1,38 @@
+"""chat_messages_pair_index
+
+Revision ID: c48a1f0d6e27
+Revises: 7d2e4b91c0a8
+Create Date: 2026-10-18 11:41:09.662035
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c48a1f0d6e27'
+down_revision: Union[str, Sequence[str], None] = '7d2e4b91c0a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_chat_messages_pair_created_at',
+        'chat_messages',
+        [
+            sa.text('least(sender_id, recipient_id)'),
+            sa.text('greatest(sender_id, recipient_id)'),
+            'created_at',
+            'id',
+        ],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_messages_pair_created_at', table_name='chat_messages')
@@ -0,0 +1,101 @@
+"""orders_archive
+
+Revision ID: d7a3f5c2e816
+Revises: 4c9d2e7f1b58
+Create Date: 2026-10-18 15:06:44.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f5c2e816'
+down_revision: Union[str, Sequence[str], None] = '4c9d2e7f1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARCHIVED_COLUMNS = (
+    "id, title, description, image_url, logo_url, price, address, "
+    "begin_time, end_time, created_at, updated_at, version, user_id"
+)
+
+# Совпадает со значением по умолчанию ORDER_ARCHIVE_AFTER_DAYS
+ARCHIVE_AFTER = "interval '30 days'"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('orders_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('image_url', sa.String(length=512), nullable=True),
+    sa.Column('logo_url', sa.String(length=512), nullable=True),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('address', sa.String(length=255), nullable=False),
+    sa.Column('begin_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_orders_archive_user_id', 'orders_archive', ['user_id'], unique=False)
+    op.create_table('order_views_archive',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.SmallInteger(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders_archive.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'order_id')
+    )
+    op.create_index('ix_order_views_archive_order_id', 'order_views_archive', ['order_id'], unique=False)
+
+    # Давно завершенные заказы переносятся сразу; дальше это делает OrderArchiver
+    op.execute(f"""
+        INSERT INTO orders_archive ({ARCHIVED_COLUMNS})
+        SELECT {ARCHIVED_COLUMNS} FROM orders
+        WHERE end_time < now() - {ARCHIVE_AFTER}
+    """)
+    op.execute("""
+        INSERT INTO order_views_archive (user_id, order_id, status)
+        SELECT v.user_id, v.order_id, v.status
+        FROM order_views v
+        JOIN orders_archive a ON a.id = v.order_id
+    """)
+    op.execute("DELETE FROM orders o USING orders_archive a WHERE o.id = a.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"""
+        INSERT INTO orders ({ARCHIVED_COLUMNS})
+        SELECT {ARCHIVED_COLUMNS} FROM orders_archive
+    """)
+    op.execute("""
+        INSERT INTO order_views (user_id, order_id, status)
+        SELECT user_id, order_id, status FROM order_views_archive
+    """)
+    # Агрегаты вернувшихся заказов пересчитываются по их просмотрам
+    op.execute("""
+        INSERT INTO order_stats (order_id, views_count, status_priority, connected_count)
+        SELECT v.order_id,
+               count(*)::int,
+               max(v.status),
+               (count(*) FILTER (WHERE v.status >= 1 AND v.status = v.max_status))::int
+        FROM (
+            SELECT order_id, status, max(status) OVER (PARTITION BY order_id) AS max_status
+            FROM order_views_archive
+        ) v
+        GROUP BY v.order_id
+    """)
+    op.drop_index('ix_order_views_archive_order_id', table_name='order_views_archive')
+    op.drop_table('order_views_archive')
+    op.drop_index('ix_orders_archive_user_id', table_name='orders_archive')
+    op.drop_table('orders_archive')
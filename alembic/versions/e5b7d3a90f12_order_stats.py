@@ -0,0 +1,50 @@
+"""order_stats
+
+Revision ID: e5b7d3a90f12
+Revises: c48a1f0d6e27
+Create Date: 2026-10-18 12:27:53.910447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7d3a90f12'
+down_revision: Union[str, Sequence[str], None] = 'c48a1f0d6e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('order_stats',
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('views_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('status_priority', sa.SmallInteger(), nullable=True),
+    sa.Column('connected_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('order_id')
+    )
+    # Начальное заполнение по существующим просмотрам
+    op.execute("""
+        INSERT INTO order_stats (order_id, views_count, status_priority, connected_count)
+        SELECT o.id,
+               count(v.user_id),
+               max(v.status),
+               count(*) FILTER (WHERE v.status >= 1 AND v.status = v.max_status)
+        FROM orders o
+        LEFT JOIN (
+            SELECT order_id, user_id, status,
+                   max(status) OVER (PARTITION BY order_id) AS max_status
+            FROM order_views
+        ) v ON v.order_id = o.id
+        GROUP BY o.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('order_stats')
@@ -1,23 +1,46 @@
 from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
 from app.config.settings import settings
+from app.services.image_refs import acquire_images, release_images
 from app.services.images import ImageService
 
 image_service = ImageService()
 
+# Файлы, потерявшие последнюю ссылку в текущей транзакции сессии.
+# Удаляются после коммита (app.services.image_cleanup), при откате забываются
+PENDING_IMAGE_DELETES = "pending_image_deletes"
+
+def _filenames(urls) -> list:
+    return [name for name in map(image_service.filename_from_url, urls) if name]
+
+def _schedule_delete(target, filenames: list) -> None:
+    if filenames:
+        session = object_session(target)
+        session.info.setdefault(PENDING_IMAGE_DELETES, set()).update(filenames)
+
 def register_model_cleanup(model, fields: list):
+    """Ведет счетчики image_refs по полям с URL изображений.
+
+    Файл удаляется, только когда пропадает последняя ссылка на него,
+    и только после коммита транзакции.
+    """
+    @event.listens_for(model, "after_insert")
+    def after_insert_listener(mapper, connection, target):
+        acquire_images(connection, _filenames(getattr(target, field) for field in fields))
+
     @event.listens_for(model, "before_update")
     def before_update_listener(mapper, connection, target):
         state = inspect(target)
+        added, deleted = [], []
         for field in fields:
             history = state.get_history(field, False)
-            if history.has_changes() and history.deleted:
-                old_url = history.deleted[0]
-                if old_url:
-                    image_service.delete_image(old_url)
+            if history.has_changes():
+                added.extend(history.added)
+                deleted.extend(history.deleted)
+        acquire_images(connection, _filenames(added))
+        _schedule_delete(target, release_images(connection, _filenames(deleted)))
 
     @event.listens_for(model, "before_delete")
     def before_delete_listener(mapper, connection, target):
-        for field in fields:
-            url = getattr(target, field)
-            if url:
-                image_service.delete_image(url)
\ No newline at end of file
+        urls = [getattr(target, field) for field in fields]
+        _schedule_delete(target, release_images(connection, _filenames(urls)))
@@ -16,14 +16,58 @@ class Settings(BaseSettings):
     JWT_ACCESS_EXPIRE: int = Field(default=3600)
     JWT_PUBLIC_KEY: str = Field(default="")
     JWT_PRIVATE_KEY: str = Field(default="")
+    JWT_KEYS_DIR: Path = Field(default=Path("keys"))
+    JWT_ACTIVE_KID: str = Field(default="")
+    JWT_KEYS_RELOAD_INTERVAL: float = Field(default=60.0)
     
     REFRESH_EXPIRE: int = Field(default=604800)
     JWT_REFRESH_SECRET: str = Field(default="")
+    REFRESH_SWEEP_INTERVAL: float = Field(default=3600.0)
+    REFRESH_SWEEP_BATCH_SIZE: int = Field(default=5000)
     
     IMAGE_STORAGE: Path = Path("/app/storage")  # Docker volume
     IMAGE_BASE_URL: str = "/storage/images"
     ALLOWED_EXTENSIONS: set = {".jpg", ".jpeg", ".png", ".webp"}
     MAX_FILE_SIZE: int = 10 * 1024 * 1024 # 10MB
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    # Кэш уменьшенных копий отдельно от оригиналов, его можно очищать целиком
+    IMAGE_VARIANT_CACHE: Path = Path("/app/storage_variants")
+    IMAGE_VARIANT_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024 # 1GB
+    IMAGE_VARIANT_WIDTHS: set = {160, 320, 640, 1280}
+    IMAGE_VARIANT_WORKERS: int = Field(default=2)
+    # Файлы свежее этого возраста не удаляются: их могли только что загрузить повторно
+    IMAGE_DELETE_INTERVAL: float = Field(default=1.0)
+    IMAGE_DELETE_MIN_AGE: float = Field(default=600.0)
+    IMAGE_ORPHAN_SWEEP_INTERVAL: float = Field(default=6 * 3600.0)
+    IMAGE_ORPHAN_GRACE: float = Field(default=24 * 3600.0)
+    
+    PASSWORD_HASH_WORKERS: int = Field(default=2)
+    PASSWORD_HASH_MAX_QUEUE: int = Field(default=32)
+    
+    CHAT_BROKER: str = Field(default="memory")  # memory | postgres
+    CHAT_CHANNEL: str = Field(default="chat_events")
+    CHAT_SEND_QUEUE_SIZE: int = Field(default=256)
+    CHAT_OVERFLOW_POLICY: str = Field(default="drop_oldest")  # drop_oldest | disconnect
+    CHAT_GROUP_COMMIT: bool = Field(default=False)
+    CHAT_BATCH_MAX_SIZE: int = Field(default=100)
+    CHAT_BATCH_MAX_DELAY_MS: int = Field(default=5)
+    
+    ORDER_VIEW_BUFFER_ENABLED: bool = Field(default=True)
+    ORDER_VIEW_FLUSH_INTERVAL: float = Field(default=2.0)
+    ORDER_VIEW_BUFFER_SIZE: int = Field(default=10000)
+    
+    ORDER_ARCHIVE_AFTER_DAYS: int = Field(default=30)
+    ORDER_ARCHIVE_INTERVAL: float = Field(default=3600.0)
+    ORDER_ARCHIVE_BATCH_SIZE: int = Field(default=1000)
+    
+    # 13 колонок на строку: пачка должна укладываться в 32767 параметров asyncpg
+    ORDER_IMPORT_CHUNK_SIZE: int = Field(default=500)
+    ORDER_IMPORT_MAX_REPORTED_ERRORS: int = Field(default=1000)
+    
+    USER_CACHE_TTL: float = Field(default=30.0)
+    USER_CACHE_MAXSIZE: int = Field(default=10000)
+    ORDER_CACHE_TTL: float = Field(default=5.0)
+    ORDER_CACHE_MAXSIZE: int = Field(default=10000)
     
     @property
     def DATABASE_URL(self) -> PostgresDsn:
@@ -45,7 +89,7 @@ class Settings(BaseSettings):
         
     def _load_key_files(self):
         """Загружает ключи из файлов только если они не заданы в environment"""
-        keys_dir = Path("keys")
+        keys_dir = self.JWT_KEYS_DIR
         keys_dir.mkdir(exist_ok=True)
         
         # Для приватного ключа
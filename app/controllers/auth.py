@@ -6,7 +6,7 @@ from app.models.user import User
 from app.dependencies.database import AsyncSession, get_db
 from app.services.auth import AuthService
 from app.schemas.auth import Token
-from app.utils.security import verify_password
+from app.utils.security import hash_token, verify_password_async
 
 router = APIRouter(tags=["auth"])
 
@@ -22,7 +22,7 @@ async def login(
     user = await service.session.execute(select(User).where(User.phone == phone))
     user = user.scalar()
     
-    if not user or not verify_password(password, user.password):
+    if not user or not await verify_password_async(password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect phonenumber or password",
@@ -49,7 +49,7 @@ async def logout(
 ):
     result = await service.session.execute(
         update(RefreshToken)
-        .where(RefreshToken.token == refresh_token)
+        .where(RefreshToken.token_hash == hash_token(refresh_token))
         .values(revoked=True)
     )
     await service.session.commit()
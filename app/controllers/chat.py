@@ -1,17 +1,18 @@
 import json
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, WebSocket, Query, WebSocketDisconnect, WebSocketException, status
+from fastapi import APIRouter, Depends, Response, WebSocket, Query, WebSocketDisconnect, WebSocketException, status
 from fastapi.logger import logger
 from app.schemas.chat_messages import ChatListItem, ChatMessageResponse
 from app.schemas.users import UserResponse
 from app.services.chat import ChatService
-from app.services.connection_manager import ConnectionManager
+from app.services.connection_manager import manager
 from app.dependencies.database import async_session, get_db
 from app.dependencies.auth import get_current_user, get_current_user_from_token
+from app.utils.pagination import set_next_cursor
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(tags=["chat"])
-manager = ConnectionManager()
 
 @router.websocket("/ws/chat")
 async def websocket_endpoint(
@@ -19,54 +20,71 @@ async def websocket_endpoint(
     token: str = Query(...)
 ):
     try:
+        # Сессия берется из пула только на время действия и сразу возвращается,
+        # иначе каждый открытый сокет держал бы соединение с БД
         async with async_session() as session:
             user = await get_current_user_from_token(token, session)
-            await manager.connect(websocket, user)
-            
-            try:
-                while True:
-                    try:
-                        data = await websocket.receive_json()
+        connection = await manager.connect(websocket, user)
+        
+        try:
+            while True:
+                try:
+                    data = await websocket.receive_json()
+                    async with async_session() as session:
                         await manager.handle_action(data, user, session)
-                    except json.JSONDecodeError:
-                        await websocket.send_json({
-                            "error": "Invalid JSON format"
-                        })
-                    except WebSocketException as e:
-                        await websocket.send_json({
-                            "status": "error",
-                            "code": e.code,
-                            "detail": e.reason
-                        })
-                        await websocket.close(code=e.code)
-                        break
-            except WebSocketDisconnect:
-                manager.disconnect(user)
-                
+                except json.JSONDecodeError:
+                    await websocket.send_json({
+                        "error": "Invalid JSON format"
+                    })
+                except WebSocketException as e:
+                    await websocket.send_json({
+                        "status": "error",
+                        "code": e.code,
+                        "detail": e.reason
+                    })
+                    await websocket.close(code=e.code)
+                    break
+        except WebSocketDisconnect:
+            pass
+        finally:
+            manager.disconnect(connection)
+            
     except Exception as e:
         await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason=f"WebSocket error: {e}")
         logger.error(f"WebSocket error: {e}")
         
 @router.get("/chats/", response_model=list[ChatListItem])
 async def get_user_chats(
+    response: Response,
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
 ):
     service = ChatService(db)
-    return await service.get_user_chats(current_user.id)
+    chats, next_cursor = await service.get_user_chats(current_user.id, limit, cursor)
+    set_next_cursor(response.headers, next_cursor)
+    return chats
 
 @router.get("/{partner_id}/messages", response_model=list[ChatMessageResponse])
 async def get_chat_history(
     partner_id: UUID,
+    response: Response,
     current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-    limit: int = 20,
-    offset: int = 0
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = 0,
+    before: Optional[str] = None,
+    after: Optional[str] = None
 ):
     service = ChatService(db)
-    return await service.get_chat_history(
+    messages, next_cursor = await service.get_chat_history(
         current_user.id, 
         partner_id, 
         limit, 
-        offset
-    )
\ No newline at end of file
+        offset,
+        before=before,
+        after=after
+    )
+    set_next_cursor(response.headers, next_cursor)
+    return messages
\ No newline at end of file
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, Depends
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
 
-from app.schemas.images import ImageResponse
+from app.config.settings import settings
+from app.schemas.images import ImageFormat, ImageResponse
+from app.services.image_variants import image_variants
 from app.services.images import ImageService
 
 
 router = APIRouter(tags=["storage"])
 
+# Оригиналы без параметров отдаются так же, как через смонтированный StaticFiles
+originals = StaticFiles(directory=settings.IMAGE_STORAGE, check_dir=False)
+
 def get_image_service() -> ImageService:
     return ImageService()
 
@@ -15,4 +23,28 @@ async def upload_image(
     image_service: ImageService = Depends(get_image_service)
 ):
     url = await image_service.save_image(file)
-    return ImageResponse(url=url)
\ No newline at end of file
+    return ImageResponse(url=url)
+
+# Маршрут объявлен раньше app.mount и поэтому перехватывает файлы из корня хранилища
+@router.get(f"{settings.IMAGE_BASE_URL}/{{name}}", include_in_schema=False)
+async def get_image(
+    request: Request,
+    name: str = Path(...),
+    w: Optional[int] = Query(None),
+    fmt: Optional[ImageFormat] = Query(None),
+):
+    if w is None and fmt is None:
+        return await originals.get_response(name, request.scope)
+    if w is not None and w not in settings.IMAGE_VARIANT_WIDTHS:
+        raise HTTPException(
+            400,
+            f"Unsupported width. Allowed: {sorted(settings.IMAGE_VARIANT_WIDTHS)}"
+        )
+    
+    path, media_type = await image_variants.get_variant(name, w, fmt.value if fmt else None)
+    return FileResponse(
+        path,
+        media_type=media_type,
+        # Не immutable: после удаления оригинала вариант должен перестать отдаваться
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Path, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Path, Query, Request, Response, status
 from app.dependencies.auth import get_current_user
 from app.schemas.users import UserResponse
 from app.schemas.view_order import ViewOrderUpdate
+from app.services.order_import import OrderImportService
+from app.services.order_view_buffer import order_view_buffer
 from app.services.orders import OrderService
-from app.schemas.orders import OrderCreate, OrderResponse, OrderUpdate
+from app.schemas.orders import ConnectedOrdersFilter, OrderCreate, OrderFeedFilter, OrderImportReport, OrderResponse, OrderSort, OrderUpdate
 from app.dependencies.database import AsyncSession, get_db
+from app.utils.etag import etag_matches, not_modified
+from app.utils.pagination import set_next_cursor
+from app.utils.responses import FastJSONResponse
 from uuid import UUID
 
 router = APIRouter(tags=["orders"])
@@ -26,12 +32,28 @@ async def create_order(
             detail=str(e)
         ) from e
 
+@router.post("/orders/import", response_model=OrderImportReport)
+async def import_orders(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    user: UserResponse = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if content_type.startswith("text/csv") else "ndjson"
+    service = OrderImportService(session)
+    return await service.import_orders(user.id, request.stream(), format)
+
 @router.post("/orders/{order_id}/view", status_code=204)
 async def mark_order_viewed(
     order_id: UUID,
     user: UserResponse = Depends(get_current_user),
     service: OrderService = Depends(get_order_service),
 ):
+    # Простой просмотр пишется отложенно; при выключенном или полном буфере - сразу
+    if order_view_buffer.add(user.id, order_id):
+        return
     await service.mark_viewed(
         current_user_id=user.id,
         user_id=user.id, 
@@ -53,27 +75,79 @@ async def update_order_status(
         status=view_data.status
     )
 
-@router.get("/orders/", response_model=list[OrderResponse])
+@router.get("/orders/", response_model=list[OrderResponse], response_class=FastJSONResponse)
 async def get_all(
     service: OrderService = Depends(get_order_service),
     offset: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    sort: OrderSort = OrderSort.newest,
+    cursor: Optional[str] = None,
+    filters: OrderFeedFilter = Depends(),
+    if_none_match: Optional[str] = Header(None),
 ):
-    return await service.get_all_orders(offset, limit)
+    if if_none_match:
+        etag = await service.get_all_orders_etag(
+            offset, limit, sort=sort, cursor=cursor, filters=filters
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
+    orders, next_cursor, etag = await service.get_all_orders(
+        offset, limit, sort=sort, cursor=cursor, filters=filters
+    )
+    # Заголовки передаются явно: готовый Response не сливается с параметром response
+    headers = {"ETag": etag}
+    set_next_cursor(headers, next_cursor)
+    return FastJSONResponse(orders, headers=headers)
 
-@router.get("/orders/connected", response_model=list[OrderResponse])
+@router.get("/orders/connected", response_model=list[OrderResponse], response_class=FastJSONResponse)
 async def get_connected(
     service: OrderService = Depends(get_order_service),
     user: UserResponse = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    filters: ConnectedOrdersFilter = Depends(),
+    if_none_match: Optional[str] = Header(None),
+):
+    if if_none_match:
+        etag = await service.get_connected_orders_etag(user.id, limit, cursor, filters)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
+    orders, next_cursor, etag = await service.get_connected_orders(
+        user.id, limit, cursor, filters
+    )
+    headers = {"ETag": etag}
+    set_next_cursor(headers, next_cursor)
+    return FastJSONResponse(orders, headers=headers)
+
+@router.get("/orders/search", response_model=list[OrderResponse], response_class=FastJSONResponse)
+async def search_orders(
+    q: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    service: OrderService = Depends(get_order_service),
 ):
-    return await service.get_connected_orders(user_id=user.id)
+    orders, next_cursor = await service.search_orders(q, limit, cursor)
+    headers = {}
+    set_next_cursor(headers, next_cursor)
+    return FastJSONResponse(orders, headers=headers)
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order(
+    response: Response,
     order_id: UUID = Path(...),
     service: OrderService = Depends(get_order_service),
+    if_none_match: Optional[str] = Header(None),
 ):
-    return await service.get_order(order_id)
+    if if_none_match:
+        etag = await service.get_order_etag(order_id)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
+    order, etag = await service.get_order_with_etag(order_id)
+    response.headers["ETag"] = etag
+    return order
 
 @router.put("/orders/{order_id}", response_model=OrderResponse)
 async def update_order(
@@ -1,9 +1,11 @@
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Path, status
+from fastapi import APIRouter, Depends, Header, Path, Response, status
 from app.dependencies.auth import get_current_user
 from app.services.users import UserService
 from app.schemas.users import UserCreate, UserResponse, UserUpdate
 from app.dependencies.database import AsyncSession, get_db
+from app.utils.etag import etag_matches, http_date, not_modified, not_modified_since
 
 router = APIRouter(tags=["users"])
 
@@ -19,10 +21,27 @@ async def create_user(
 
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user(
+    response: Response,
     user_id: UUID = Path(..., description="User ID"),
     service: UserService = Depends(get_user_service),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
 ):
-    return await service.get_user(user_id)
+    if if_none_match or if_modified_since:
+        validators = await service.get_user_etag(user_id)
+        if validators:
+            etag, updated_at = validators
+            # If-Modified-Since учитывается только без If-None-Match (RFC 9110, 13.1.3)
+            if (
+                etag_matches(if_none_match, etag) if if_none_match
+                else not_modified_since(if_modified_since, updated_at)
+            ):
+                return not_modified(etag, updated_at)
+    
+    user, etag, updated_at = await service.get_user_with_etag(user_id)
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(updated_at)
+    return user
 
 @router.get("/users/", response_model=UserResponse)
 async def get_me(
@@ -4,6 +4,7 @@ from jose import JWTError
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app.utils.cache import user_cache
 from app.utils.security import credentials_exception
 from app.models.user import User
 from app.schemas.users import UserResponse
@@ -15,6 +16,24 @@ security_scheme = HTTPBearer(
     description="Введите токен в формате: Bearer <ваш_токен>"
 )
 
+async def _load_user(user_id: str, db: AsyncSession) -> UserResponse | None:
+    """Возвращает пользователя из кэша или загружает его из БД"""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    stmt = select(User).where(User.id == user_id).options(
+        selectinload(User.company)
+    )
+    result = await db.execute(stmt)
+    user = result.scalar_one_or_none()
+    if not user:
+        return None
+
+    response = UserResponse.model_validate(user)
+    user_cache.set(user_id, response)
+    return response
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
     db: AsyncSession = Depends(get_db)
@@ -22,14 +41,10 @@ async def get_current_user(
     auth_service = AuthService(db)
     try:
         token_data = auth_service.verify_token(credentials.credentials)
-        stmt = select(User).where(User.id == token_data.user_id).options(
-            selectinload(User.company)
-        )
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
+        user = await _load_user(token_data.user_id, db)
         if not user:
             raise credentials_exception
-        return UserResponse.model_validate(user)
+        return user
     except JWTError:
         raise credentials_exception
     
@@ -45,13 +60,9 @@ async def get_current_user_from_token(
     auth_service = AuthService(db)
     try:
         token_data = auth_service.verify_token(token)
-        stmt = select(User).where(User.id == token_data.user_id).options(
-            selectinload(User.company)
-        )
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
+        user = await _load_user(token_data.user_id, db)
         if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
-        return UserResponse.model_validate(user)
+        return user
     except JWTError as e:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
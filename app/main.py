@@ -1,12 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from app.config.settings import settings
 from app.controllers import images, reviews, users, orders, auth, companies, chat
+from app.services.image_cleanup import image_deleter, orphan_image_sweeper
+from app.services.image_variants import image_variants
 from app.services.images import ImageService
+from app.services.order_archive import order_archiver
+from app.services.order_view_buffer import order_view_buffer
+from app.services.token_cleanup import refresh_token_sweeper
+from app.utils.keyring import key_ring
+from app.utils.security import password_hasher
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    key_ring.load()
+    refresh_token_sweeper.start()
+    await chat.manager.start()
+    order_view_buffer.start()
+    order_archiver.start()
+    image_deleter.start()
+    orphan_image_sweeper.start()
+    yield
+    await orphan_image_sweeper.stop()
+    await image_deleter.stop()
+    await order_archiver.stop()
+    await order_view_buffer.stop()
+    await chat.manager.stop()
+    await refresh_token_sweeper.stop()
+    password_hasher.shutdown()
+    image_variants.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
+    lifespan=lifespan,
 )
 
 app.include_router(auth.router)
@@ -22,4 +50,4 @@ app.mount(
     settings.IMAGE_BASE_URL, 
     StaticFiles(directory=settings.IMAGE_STORAGE), 
     name="images"
-)
\ No newline at end of file
+)
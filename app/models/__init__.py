@@ -3,8 +3,11 @@ from .user import User
 from .company import Company
 from .order import Order
 from .order_view import OrderView
+from .order_stats import OrderStats
+from .order_archive import OrderArchive, OrderViewArchive
 from .token import RefreshToken
 from .review import Review
 from .chat_message import ChatMessage
+from .image_ref import ImageRef
 
-__all__ = ["Base", "User", "Company", "Order", "OrderView", "RefreshToken", "Review", "ChatMessage"]
\ No newline at end of file
+__all__ = ["Base", "User", "Company", "Order", "OrderView", "OrderStats", "OrderArchive", "OrderViewArchive", "RefreshToken", "Review", "ChatMessage", "ImageRef"]
\ No newline at end of file
@@ -1,11 +1,15 @@
 import uuid
-from sqlalchemy import UUID, Boolean, Column, String, DateTime, ForeignKey
+from sqlalchemy import UUID, Boolean, Column, Index, String, DateTime, ForeignKey, func
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.models.base import Base
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index('ix_chat_messages_sender_id_created_at', 'sender_id', 'created_at'),
+        Index('ix_chat_messages_recipient_id_created_at', 'recipient_id', 'created_at'),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     message = Column(String(512))
@@ -17,4 +21,14 @@ class ChatMessage(Base):
     recipient_id = Column(UUID(as_uuid=True), ForeignKey("users.id",ondelete="CASCADE"))
     
     sender = relationship("User", foreign_keys=[sender_id])
-    recipient = relationship("User", foreign_keys=[recipient_id])
\ No newline at end of file
+    recipient = relationship("User", foreign_keys=[recipient_id])
+
+# Пара участников нормализуется (least, greatest), чтобы оба направления
+# переписки попадали в один диапазон индекса
+Index(
+    'ix_chat_messages_pair_created_at',
+    func.least(ChatMessage.sender_id, ChatMessage.recipient_id),
+    func.greatest(ChatMessage.sender_id, ChatMessage.recipient_id),
+    ChatMessage.created_at,
+    ChatMessage.id,
+)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.models.base import Base
+
+
+class ImageRef(Base):
+    """Число ссылок на файл в IMAGE_STORAGE из users, orders и orders_archive"""
+    __tablename__ = "image_refs"
+
+    filename = Column(String(255), primary_key=True)
+    refcount = Column(Integer, nullable=False, default=0, server_default="0")
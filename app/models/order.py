@@ -1,15 +1,27 @@
-from sqlalchemy import Column, Index, String, Text, Numeric, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime, timezone
+from sqlalchemy import Column, Computed, Index, Integer, String, Text, Numeric, DateTime, ForeignKey, func, literal_column
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 import uuid
 from app.config.events import register_model_cleanup
 from app.models.base import Base
 
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(address, '')), 'C')"
+)
+
 class Order(Base):
     __tablename__ = "orders"
     __table_args__ = (
-        Index('ix_orders_user_id', 'user_id'),
-        Index('ix_orders_price', 'price'),
+        # Индексы под сортировки ленты: (ключ сортировки, id) для keyset-пагинации
+        Index('ix_orders_user_id_created_at', 'user_id', 'created_at', 'id'),
+        Index('ix_orders_created_at', 'created_at', 'id'),
+        Index('ix_orders_begin_time', 'begin_time', 'id'),
+        Index('ix_orders_price', 'price', 'id'),
+        Index('ix_orders_end_time', 'end_time'),
+        Index('ix_orders_search_vector', 'search_vector', postgresql_using='gin'),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -21,7 +33,30 @@ class Order(Base):
     address = Column(String(255), nullable=False)
     begin_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now()
+    )
+    # Растет при каждом UPDATE; вместе с order_stats дает ETag заказа
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1")
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now()
+    )
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id",ondelete="CASCADE"), nullable=False)
+    # Генерируется базой; не загружается вместе с заказом
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
     owner = relationship("User", back_populates="orders")
     viewers = relationship(
         "User", 
@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Numeric, SmallInteger, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.models.base import Base
+
+
+class OrderArchive(Base):
+    """Завершенные заказы, перенесенные из orders фоновым OrderArchiver"""
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index('ix_orders_archive_user_id', 'user_id'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text)
+    image_url = Column(String(512))
+    logo_url = Column(String(512))
+    price = Column(Numeric(10, 2))
+    address = Column(String(255), nullable=False)
+    begin_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    version = Column(Integer, nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    archived_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now()
+    )
+
+
+class OrderViewArchive(Base):
+    __tablename__ = "order_views_archive"
+    __table_args__ = (
+        Index('ix_order_views_archive_order_id', 'order_id'),
+    )
+
+    user_id = Column(UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    order_id = Column(UUID(as_uuid=True),
+        ForeignKey("orders_archive.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    status = Column(SmallInteger, nullable=True, default=None)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Integer, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID
+from app.models.base import Base
+
+
+class OrderStats(Base):
+    """Агрегаты по order_views, поддерживаемые OrderService.mark_viewed и UserService.delete_user"""
+    __tablename__ = "order_stats"
+    
+    order_id = Column(UUID(as_uuid=True),
+        ForeignKey("orders.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    views_count = Column(Integer, nullable=False, default=0, server_default="0")
+    status_priority = Column(SmallInteger, nullable=True, default=None)
+    connected_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -7,6 +7,8 @@ class OrderView(Base):
     __tablename__ = "order_views"
     __table_args__ = (
         Index('ix_order_views_order_id', 'order_id'),
+        # Заказы, в которых пользователь участвует исполнителем
+        Index('ix_order_views_user_id_status', 'user_id', 'status'),
     )
     
     user_id = Column(UUID(as_uuid=True),
@@ -1,17 +1,22 @@
 from datetime import datetime, timezone
 import uuid
-from sqlalchemy import Boolean, Column, String, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, LargeBinary, text
 from sqlalchemy.dialects.postgresql import UUID
 from app.models.base import Base
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index('ix_refresh_tokens_expires_at', 'expires_at'),
+        Index('ix_refresh_tokens_revoked', 'id', postgresql_where=text('revoked')),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id",ondelete="CASCADE"), nullable=False)
-    token = Column(String(512), unique=True, nullable=False)
+    # sha256 от токена: сам JWT в базе не хранится
+    token_hash = Column(LargeBinary(32), unique=True, nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     revoked = Column(Boolean, default=False)
 
     def is_active(self):
-        return not self.revoked and self.expires_at > datetime.now(timezone.utc)
\ No newline at end of file
+        return not self.revoked and self.expires_at > datetime.now(timezone.utc)
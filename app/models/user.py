@@ -1,4 +1,5 @@
-from sqlalchemy import Column, ForeignKey, String
+from datetime import datetime, timezone
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -16,6 +17,21 @@ class User(Base):
     address = Column(String(255))
     inn = Column(String(12), unique=True, index=True)
     image_url = Column(String(511))
+    # ETag и Last-Modified профиля; смена компании тоже поднимает версию
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1")
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now()
+    )
     orders = relationship(
         "Order", 
         back_populates="owner",
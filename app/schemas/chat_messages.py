@@ -9,7 +9,8 @@ from typing import Optional
 class ChatMessageAction(BaseModel):
     action: str  # send/edit/delete
     message_id: Optional[UUID4] = None
-    content: Optional[str] = None
+    # Совпадает с длиной колонки chat_messages.message
+    content: Optional[str] = Field(None, max_length=512)
     recipient_id: Optional[UUID4] = None
     
     model_config = ConfigDict(
@@ -1,4 +1,10 @@
+from enum import Enum
 from pydantic import BaseModel
 
 class ImageResponse(BaseModel):
-    url: str
\ No newline at end of file
+    url: str
+
+class ImageFormat(str, Enum):
+    webp = "webp"
+    jpeg = "jpeg"
+    png = "png"
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from pydantic import UUID4, BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -39,9 +40,19 @@ class OrderResponse(OrderBase):
     views_count: int = 0  
     status: Optional[str] = None  
     connected_user_ids: List[UUID4] = Field(default_factory=list)
+    # Заказ перенесен в архив и доступен только для чтения
+    archived: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
+class OrderEvent(BaseModel):
+    """Событие по заказу, рассылаемое участникам через /ws/chat"""
+    event: str  # order_status / order_updated
+    order_id: UUID4
+    status: Optional[str] = None
+    user_id: Optional[UUID4] = None
+    order: Optional[OrderResponse] = None
+
 class OrderUpdate(OrderBase):
     title: Optional[str] = Field(None, max_length=255)
     description: Optional[str] = None
@@ -50,4 +61,42 @@ class OrderUpdate(OrderBase):
     price: Optional[float] = Field(None, gt=0)
     address: Optional[str] = Field(None, max_length=255)
     begin_time: Optional[datetime] = None
-    end_time: Optional[datetime] = None
\ No newline at end of file
+    end_time: Optional[datetime] = None
+
+class OrderSort(str, Enum):
+    newest = "newest"
+    begin_time = "begin_time"
+    price = "price"
+    price_desc = "price_desc"
+
+class OrderFeedFilter(BaseModel):
+    price_min: Optional[float] = Field(None, ge=0)
+    price_max: Optional[float] = Field(None, ge=0)
+    begins_after: Optional[datetime] = None
+    ends_before: Optional[datetime] = None
+    owner_id: Optional[UUID4] = None
+
+class ConnectedRole(str, Enum):
+    owner = "owner"
+    participant = "participant"
+
+class ConnectedOrdersFilter(BaseModel):
+    role: Optional[ConnectedRole] = None
+    status: Optional[str] = Field(None, max_length=24)
+    
+    @field_validator('status')
+    def validate_status(cls, v):
+        allowed = [None, "ожидание", "в работе", "завершен"]
+        if v not in allowed:
+            raise ValueError(f"Invalid status. Allowed: {allowed}")
+        return v
+
+class OrderImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class OrderImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[OrderImportError] = Field(default_factory=list)
+    errors_truncated: bool = False
@@ -1,65 +1,24 @@
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
+from jose import JWTError
 from sqlalchemy import UUID, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.settings import settings
 from app.models.token import RefreshToken
-from app.utils.security import credentials_exception
+from app.utils.keyring import key_ring
+from app.utils.security import credentials_exception, hash_token
 from app.schemas.auth import TokenData
 
 class AuthService:    
     def __init__(self, session: AsyncSession):
         self.algorithm = settings.JWT_ALGORITHM
-        self.private_key, self.public_key = self._load_keys()
+        self.key_ring = key_ring
         self.access_expire = settings.JWT_ACCESS_EXPIRE
         self.refresh_expire = settings.REFRESH_EXPIRE
         self.refresh_secret = settings.JWT_REFRESH_SECRET
         self.session = session
 
-    def _load_keys(self):
-        """Загружает или генерирует ключи при необходимости"""
-        keys_dir = Path("keys")
-        private_key_file = keys_dir / "jwt_private.pem"
-        public_key_file = keys_dir / "jwt_public.pem"
-        
-        if settings.JWT_PRIVATE_KEY and settings.JWT_PUBLIC_KEY:
-            private_key = serialization.load_pem_private_key(
-                settings.JWT_PRIVATE_KEY.encode(),
-                password=None,
-                backend=default_backend()
-            )
-            public_key = serialization.load_pem_public_key(
-                settings.JWT_PUBLIC_KEY.encode(),
-                backend=default_backend()
-            )
-            return private_key, public_key
-        
-        keys_dir.mkdir(exist_ok=True)
-        if not private_key_file.exists() or not public_key_file.exists():
-            raise FileExistsError("keys files not found")
-        else:
-            with open(private_key_file, "rb") as f:
-                private_key = serialization.load_pem_private_key(
-                    f.read(),
-                    password=None,
-                    backend=default_backend()
-                )
-            with open(public_key_file, "rb") as f:
-                public_key = serialization.load_pem_public_key(
-                    f.read(),
-                    backend=default_backend()
-                )
-        
-        settings.JWT_PRIVATE_KEY = private_key
-        settings.JWT_PUBLIC_KEY = public_key
-        
-        return private_key, public_key
-        
     async def create_tokens(self, user_id: UUID) -> dict:
         access_token = self._create_access_token({"sub":str(user_id)})
         refresh_token = await self._create_refresh_token(user_id)
@@ -69,23 +28,15 @@ class AuthService:
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + timedelta(seconds=self.access_expire)
         to_encode.update({"exp": expire})
-        return jwt.encode(
-            to_encode,
-            self.private_key,
-            algorithm=self.algorithm
-        )
+        return self.key_ring.encode(to_encode)
         
     async def _create_refresh_token(self, user_id: UUID) -> str:
         expire = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=settings.REFRESH_EXPIRE)
-        refresh_token = jwt.encode(
-            {"sub": str(user_id), "exp": expire},
-            self.private_key,
-            algorithm=self.algorithm
-        )
+        refresh_token = self.key_ring.encode({"sub": str(user_id), "exp": expire})
         
         db_token = RefreshToken(
             user_id=user_id,
-            token=refresh_token,
+            token_hash=hash_token(refresh_token),
             expires_at=expire
         )
         self.session.add(db_token)
@@ -95,11 +46,7 @@ class AuthService:
 
     def verify_token(self, token: str) -> TokenData:
         try:
-            payload = jwt.decode(
-                token,
-                self.public_key,
-                algorithms=[self.algorithm]
-            )
+            payload = self.key_ring.decode(token)
             user_id = payload.get("sub")
             return TokenData(user_id=user_id)
         except JWTError as e:
@@ -107,11 +54,7 @@ class AuthService:
     
     async def refresh_access_token(self, refresh_token: str) -> dict:
         try:
-            payload = jwt.decode(
-                refresh_token,
-                self.public_key,
-                algorithms=[self.algorithm]
-            )
+            payload = self.key_ring.decode(refresh_token)
             user_id = payload.get("sub")
         except (JWTError, ValueError):
             raise HTTPException(
@@ -121,7 +64,7 @@ class AuthService:
 
         db_token = await self.session.execute(
             select(RefreshToken).filter(
-                RefreshToken.token == refresh_token,
+                RefreshToken.token_hash == hash_token(refresh_token),
                 RefreshToken.user_id == user_id
             )
         )
@@ -1,99 +1,130 @@
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, case, func, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.models.chat_message import ChatMessage
 from app.models.user import User
 from app.schemas.chat_messages import ChatListItem, ChatMessageResponse
+from app.utils.pagination import decode_cursor, encode_cursor
 
 
 class ChatService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_user_chats(self, user_id: UUID) -> list[ChatListItem]:
-        stmt = select(User).where(
+    async def get_user_chats(
+        self,
+        user_id: UUID,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> tuple[list[ChatListItem], Optional[str]]:
+        partner_expr = case(
+            (ChatMessage.sender_id == user_id, ChatMessage.recipient_id),
+            else_=ChatMessage.sender_id
+        )
+        
+        # Последнее неудаленное сообщение в каждом диалоге
+        last_messages = select(
+            ChatMessage,
+            partner_expr.label("partner_id")
+        ).where(
             and_(
                 or_(
-                    User.id.in_(
-                        select(ChatMessage.sender_id)
-                        .where(ChatMessage.recipient_id == user_id)
-                    ),
-                    User.id.in_(
-                        select(ChatMessage.recipient_id)
-                        .where(ChatMessage.sender_id == user_id)
-                    )
+                    ChatMessage.sender_id == user_id,
+                    ChatMessage.recipient_id == user_id
                 ),
                 ChatMessage.is_deleted != True
             )
-        ).distinct()
+        ).distinct(partner_expr).order_by(
+            partner_expr,
+            ChatMessage.created_at.desc(),
+            ChatMessage.id.desc()
+        ).subquery()
+        
+        last_message = aliased(ChatMessage, last_messages)
+        stmt = select(last_message, User.id, User.fio).join(
+            User, User.id == last_messages.c.partner_id
+        )
+        
+        if cursor:
+            created_at, partner_id = decode_cursor(cursor, datetime, UUID)
+            stmt = stmt.where(
+                tuple_(last_messages.c.created_at, last_messages.c.partner_id)
+                < tuple_(created_at, partner_id)
+            )
+        
+        stmt = stmt.order_by(
+            last_messages.c.created_at.desc(),
+            last_messages.c.partner_id.desc()
+        ).limit(limit + 1)
         
         result = await self.db.execute(stmt)
-        partners = result.scalars().all()
+        rows = result.all()
         
-        chats = []
-        for partner in partners:
-            last_message_stmt = select(ChatMessage).where(
-                and_(
-                    ChatMessage.is_deleted != True,
-                    or_(
-                        and_(
-                            ChatMessage.sender_id == user_id,
-                            ChatMessage.recipient_id == partner.id
-                        ),
-                        and_(
-                            ChatMessage.sender_id == partner.id,
-                            ChatMessage.recipient_id == user_id
-                        )
-                    )
-                )
-            ).order_by(ChatMessage.created_at.desc()).limit(1)
-            
-            last_message_result = await self.db.execute(last_message_stmt)
-            last_message = last_message_result.scalar_one_or_none()
-            
-            last_message_response = None
-            if last_message:
-                last_message_response = ChatMessageResponse.model_validate(last_message)
-            
-            chats.append(ChatListItem(
-                id=partner.id,
-                username=partner.fio,
-                last_message=last_message_response
-            ))
+        chats = [
+            ChatListItem(
+                id=partner_id,
+                username=username,
+                last_message=ChatMessageResponse.model_validate(message)
+            )
+            for message, partner_id, username in rows[:limit]
+        ]
         
-        return sorted(
-            chats,
-            key=lambda x: x.last_message.created_at if x.last_message else datetime.min,
-            reverse=True
-        )
+        next_cursor = None
+        if len(rows) > limit:
+            last = chats[-1]
+            next_cursor = encode_cursor(last.last_message.created_at, last.id)
+        
+        return chats, next_cursor
     
     async def get_chat_history(
         self,
         user_id: UUID,
         partner_id: UUID,
         limit: int = 50,
-        offset: int = 0
-    ) -> list[ChatMessageResponse]:
+        offset: int = 0,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> tuple[list[ChatMessageResponse], Optional[str]]:
+        # Нормализованная пара участников попадает в ix_chat_messages_pair_created_at
+        low_id, high_id = sorted((user_id, partner_id))
         stmt = select(ChatMessage).where(
             and_(
                 ChatMessage.is_deleted != True,
-                or_(
-                    and_(
-                        ChatMessage.sender_id == user_id,
-                        ChatMessage.recipient_id == partner_id
-                    ),
-                    and_(
-                        ChatMessage.sender_id == partner_id,
-                        ChatMessage.recipient_id == user_id
-                    )
-                )
+                func.least(ChatMessage.sender_id, ChatMessage.recipient_id) == low_id,
+                func.greatest(ChatMessage.sender_id, ChatMessage.recipient_id) == high_id
             )
-        ).order_by(ChatMessage.created_at.desc()).offset(offset).limit(limit)
+        )
+        position = tuple_(ChatMessage.created_at, ChatMessage.id)
         
-        result = await self.db.execute(stmt)
+        if after:
+            # Более новые сообщения: идем вверх по индексу, затем разворачиваем
+            stmt = stmt.where(
+                position > tuple_(*decode_cursor(after, datetime, UUID))
+            ).order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+        else:
+            if before:
+                stmt = stmt.where(
+                    position < tuple_(*decode_cursor(before, datetime, UUID))
+                )
+            stmt = stmt.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            if not before and offset:
+                stmt = stmt.offset(offset)
+        
+        result = await self.db.execute(stmt.limit(limit + 1))
         messages = result.scalars().all()
         
-        return [ChatMessageResponse.model_validate(msg) for msg in messages]
\ No newline at end of file
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        next_cursor = None
+        if has_more:
+            last = messages[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        if after:
+            messages.reverse()
+        
+        return [ChatMessageResponse.model_validate(msg) for msg in messages], next_cursor
@@ -0,0 +1,155 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import WebSocketException, status
+from fastapi.logger import logger
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.dependencies.database import async_session
+from app.models.chat_message import ChatMessage
+from app.models.user import User
+
+
+class ChatMessageBatcher:
+    """Групповая запись сообщений чата.
+
+    Отправки со всех сокетов копятся в общей пачке и записываются одним
+    многострочным INSERT и одним COMMIT каждые `max_delay` секунд или по
+    достижении `max_batch_size` сообщений. submit() возвращает сообщение
+    только после коммита его пачки.
+    """
+
+    def __init__(self, max_batch_size: int, max_delay: float):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._ready = asyncio.Event()
+        self._full = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="chat batcher")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # Без cancel: текущая пачка дописывается, остальные сливаются в _run
+        self._stopping = True
+        self._ready.set()
+        self._full.set()
+        await self._task
+        self._task = None
+        self._stopping = False
+
+    async def submit(self, sender_id: UUID, recipient_id: UUID, content: str) -> ChatMessage:
+        values = {
+            "id": uuid.uuid4(),
+            "message": content,
+            "created_at": datetime.now(timezone.utc),
+            "is_edited": False,
+            "is_deleted": False,
+            "sender_id": sender_id,
+            "recipient_id": recipient_id,
+        }
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+        self._ready.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            if self._stopping and not self._pending:
+                return
+            await self._ready.wait()
+            if self._stopping and not self._pending:
+                return
+            if len(self._pending) < self.max_batch_size and not self._stopping:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_next()
+
+    async def _flush_next(self):
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if not self._pending:
+            self._ready.clear()
+        try:
+            await self._flush(batch)
+        except Exception as e:
+            logger.error(f"Chat batch failed: {e}")
+            self._fail(batch, self._database_error())
+        except BaseException:
+            # Отмена посреди записи: ожидающие не должны зависнуть навсегда
+            self._fail(batch, self._database_error())
+            raise
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]):
+        recipient_ids = {values["recipient_id"] for values, _ in batch}
+        async with async_session() as session:
+            try:
+                existing = set(await session.scalars(
+                    select(User.id).where(User.id.in_(recipient_ids))
+                ))
+                accepted = [
+                    (values, future) for values, future in batch
+                    if values["recipient_id"] in existing
+                ]
+            except SQLAlchemyError:
+                await session.rollback()
+                raise
+            failed = await self._insert(session, accepted) if accepted else set()
+
+        for values, future in batch:
+            if future.done():
+                continue
+            if values["id"] in failed:
+                future.set_exception(self._database_error())
+            elif values["recipient_id"] in existing:
+                future.set_result(ChatMessage(**values))
+            else:
+                future.set_exception(WebSocketException(
+                    code=status.WS_1003_UNSUPPORTED_DATA,
+                    reason="Recipient not found"
+                ))
+
+    async def _insert(self, session, accepted: list[tuple[dict, asyncio.Future]]) -> set[UUID]:
+        """Пишет пачку; при ошибке повторяет по одной строке. Возвращает id незаписанных"""
+        try:
+            await session.execute(
+                insert(ChatMessage).values([values for values, _ in accepted])
+            )
+            await session.commit()
+            return set()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            if len(accepted) == 1:
+                logger.error(f"Chat message insert failed: {e}")
+                return {accepted[0][0]["id"]}
+        
+        failed = set()
+        for item in accepted:
+            failed |= await self._insert(session, [item])
+        return failed
+
+    @staticmethod
+    def _database_error() -> WebSocketException:
+        return WebSocketException(
+            code=status.WS_1011_INTERNAL_ERROR,
+            reason="Database error"
+        )
+
+    def _fail(self, batch: list[tuple[dict, asyncio.Future]], error: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
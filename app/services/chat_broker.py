@@ -0,0 +1,184 @@
+import asyncio
+import json
+import uuid
+from typing import Awaitable, Callable, Iterable, Optional
+from uuid import UUID
+
+import asyncpg
+from fastapi.logger import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.settings import settings
+from app.dependencies.database import engine
+
+DeliveryHandler = Callable[[list[UUID], str], Awaitable[None]]
+
+
+class ChatBroker:
+    """Рассылает события чата всем воркерам; каждый воркер доставляет их
+    своим локально подключенным пользователям через handler"""
+
+    def __init__(self):
+        self._handler: Optional[DeliveryHandler] = None
+
+    def set_handler(self, handler: DeliveryHandler) -> None:
+        self._handler = handler
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, user_ids: Iterable[UUID], payload: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryChatBroker(ChatBroker):
+    """Доставка в пределах одного процесса"""
+
+    async def publish(self, user_ids: Iterable[UUID], payload: str) -> None:
+        await self._handler(list(user_ids), payload)
+
+
+class PostgresChatBroker(ChatBroker):
+    """Доставка между воркерами через LISTEN/NOTIFY в основной базе.
+
+    Событие больше лимита NOTIFY режется на части, которые отправляются в
+    одной транзакции: Postgres доставляет уведомления транзакции подряд и по
+    порядку, поэтому слушатель собирает их без промежуточного хранилища.
+    """
+
+    # Postgres ограничивает payload NOTIFY 8000 байтами
+    MAX_PAYLOAD = 7900
+    # Символов на часть: даже если каждый займет 4 байта UTF-8,
+    # часть вместе с обвязкой JSON укладывается в MAX_PAYLOAD
+    CHUNK_CHARS = 1200
+
+    def __init__(self, engine: AsyncEngine, dsn: str, channel: str):
+        super().__init__()
+        self.engine = engine
+        self.dsn = dsn
+        self.channel = channel
+        self._listener: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = False
+        # Собираемое событие: id и уже пришедшие части
+        self._partial: Optional[tuple[str, list[str]]] = None
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self._listen()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._listener and not self._listener.is_closed():
+            await self._listener.close()
+        self._listener = None
+
+    async def _listen(self) -> None:
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(self._on_termination)
+        await self._listener.add_listener(self.channel, self._on_notify)
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        if self._stopping or self._reconnect_task:
+            return
+        logger.error("Chat broker lost its LISTEN connection, reconnecting")
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 0.5
+        try:
+            while not self._stopping:
+                try:
+                    await self._listen()
+                    return
+                except (OSError, asyncpg.PostgresError) as e:
+                    logger.error(f"Chat broker reconnect failed: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30)
+        finally:
+            self._reconnect_task = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            if "chunk" in event:
+                payload = self._reassemble(event)
+                if payload is None:
+                    return
+                event = json.loads(payload)
+            user_ids = [UUID(user_id) for user_id in event["users"]]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Malformed chat event: {e}")
+            return
+
+        task = asyncio.create_task(self._handler(user_ids, event["data"]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _reassemble(self, part: dict) -> Optional[str]:
+        """Копит части события; возвращает его целиком после последней части"""
+        chunk_id, index, total = part["chunk"], part["part"], part["total"]
+        if self._partial is None or self._partial[0] != chunk_id:
+            if self._partial is not None:
+                logger.error("Chat event parts lost, dropping incomplete event")
+            self._partial = None
+            if index != 0:
+                return None
+            self._partial = (chunk_id, [])
+        
+        parts = self._partial[1]
+        if index != len(parts):
+            logger.error("Chat event parts out of order, dropping event")
+            self._partial = None
+            return None
+        parts.append(part["data"])
+        if len(parts) < total:
+            return None
+        self._partial = None
+        return "".join(parts)
+
+    async def publish(self, user_ids: Iterable[UUID], payload: str) -> None:
+        user_ids = list(user_ids)
+        message = json.dumps(
+            {"users": [str(user_id) for user_id in user_ids], "data": payload},
+            ensure_ascii=False
+        )
+        if len(message.encode()) <= self.MAX_PAYLOAD:
+            notifications = [message]
+        else:
+            chunk_id = uuid.uuid4().hex
+            pieces = [
+                message[start:start + self.CHUNK_CHARS]
+                for start in range(0, len(message), self.CHUNK_CHARS)
+            ]
+            notifications = [
+                json.dumps(
+                    {"chunk": chunk_id, "part": index, "total": len(pieces), "data": piece},
+                    ensure_ascii=False
+                )
+                for index, piece in enumerate(pieces)
+            ]
+
+        # Все части в одной транзакции: слушатели получат их подряд
+        async with self.engine.connect() as conn:
+            for notification in notifications:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": notification}
+                )
+            await conn.commit()
+
+
+def create_chat_broker() -> ChatBroker:
+    if settings.CHAT_BROKER == "postgres":
+        # asyncpg принимает обычный postgresql:// DSN
+        return PostgresChatBroker(engine, settings.DATABASE_SYNC_URL, settings.CHAT_CHANNEL)
+    return InMemoryChatBroker()
@@ -1,10 +1,11 @@
 from uuid import UUID
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.company import Company
 from app.models.user import User
 from app.schemas.companies import CompanyCreate, CompanyResponse
+from app.utils.cache import user_cache
 
 class CompanyService:
     def __init__(self, session: AsyncSession):
@@ -38,6 +39,7 @@ class CompanyService:
         new_company.user = user
         self.session.add(new_company)
         await self.session.commit()
+        user_cache.invalidate(str(user_id))
         await self.session.refresh(new_company)
         
         return CompanyResponse.model_validate(new_company)
@@ -61,7 +63,12 @@ class CompanyService:
         # Обновляем данные
         for field, value in company_data.model_dump().items():
             setattr(company, field, value)
+        # Компания входит в профиль пользователя: поднимаем его версию для ETag
+        await self.session.execute(
+            update(User).where(User.id == user_id).values(version=User.version + 1)
+        )
         
         await self.session.commit()
+        user_cache.invalidate(str(user_id))
         await self.session.refresh(company)
         return CompanyResponse.model_validate(company)
\ No newline at end of file
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone
 from fastapi import WebSocket, HTTPException, WebSocketException, status
 from fastapi.logger import logger
@@ -9,19 +10,79 @@ from app.models.chat_message import ChatMessage
 from app.models.user import User
 from app.schemas.users import UserResponse
 from app.schemas.chat_messages import ChatMessageResponse, ChatMessageAction
-from typing import Dict
+from app.config.settings import settings
+from app.services.chat_batcher import ChatMessageBatcher
+from app.services.chat_broker import ChatBroker, InMemoryChatBroker, create_chat_broker
+from typing import Dict, Optional, Set
+
+class ClientConnection:
+    """Один сокет пользователя с собственной очередью исходящих сообщений"""
+
+    def __init__(self, websocket: WebSocket, user_id: UUID, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write())
+
+    async def _write(self):
+        try:
+            while True:
+                payload = await self.queue.get()
+                await self.websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket writer for {self.user_id} stopped: {e}")
+
+    def stop(self):
+        if self._writer:
+            self._writer.cancel()
+            self._writer = None
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[UUID, WebSocket] = {}
+    def __init__(
+        self,
+        broker: Optional[ChatBroker] = None,
+        queue_size: int = settings.CHAT_SEND_QUEUE_SIZE,
+        overflow_policy: str = settings.CHAT_OVERFLOW_POLICY,
+        batcher: Optional[ChatMessageBatcher] = None,
+    ):
+        self.active_connections: Dict[UUID, Set[ClientConnection]] = {}
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.broker = broker or InMemoryChatBroker()
+        self.broker.set_handler(self._deliver_local)
+        self.batcher = batcher
+
+    async def start(self):
+        await self.broker.start()
+        if self.batcher:
+            self.batcher.start()
 
-    async def connect(self, websocket: WebSocket, user: UserResponse):
+    async def stop(self):
+        if self.batcher:
+            await self.batcher.stop()
+        await self.broker.stop()
+
+    async def connect(self, websocket: WebSocket, user: UserResponse) -> ClientConnection:
         await websocket.accept()
-        self.active_connections[user.id] = websocket
+        connection = ClientConnection(websocket, user.id, self.queue_size)
+        connection.start()
+        self.active_connections.setdefault(user.id, set()).add(connection)
+        return connection
 
-    def disconnect(self, user: UserResponse):
-        if user.id in self.active_connections:
-            del self.active_connections[user.id]
+    def disconnect(self, connection: ClientConnection):
+        connection.stop()
+        connections = self.active_connections.get(connection.user_id)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self.active_connections[connection.user_id]
 
     async def handle_action(self, data: dict, user: UserResponse, db: AsyncSession):
         try:
@@ -53,6 +114,12 @@ class ConnectionManager:
                     reason="Missing recipient_id or content"
                 )
 
+            if self.batcher:
+                # Подтверждение уйдет отправителю после коммита всей пачки
+                message = await self.batcher.submit(user.id, action.recipient_id, action.content)
+                await self._send_response(message)
+                return
+
             recipient = await db.get(User, action.recipient_id)
             if not recipient:
                 raise WebSocketException(
@@ -116,10 +183,49 @@ class ConnectionManager:
 
     async def _send_response(self, message: ChatMessage):
         response = ChatMessageResponse.model_validate(message)
-        recipient_ws = self.active_connections.get(message.recipient_id)
-        sender_ws = self.active_connections.get(message.sender_id)
-        
-        if recipient_ws:
-            await recipient_ws.send_text(response.model_dump_json())
-        if sender_ws and message.sender_id != message.recipient_id:
-            await sender_ws.send_text(response.model_dump_json())
+        await self.broker.publish(
+            {message.recipient_id, message.sender_id},
+            response.model_dump_json()
+        )
+
+    async def notify(self, user_ids, payload: str):
+        """Отправляет готовое событие всем сокетам указанных пользователей"""
+        await self.broker.publish(set(user_ids), payload)
+
+    async def _deliver_local(self, user_ids: list[UUID], payload: str):
+        # Только ставим в очереди: медленный клиент не задерживает остальных
+        for user_id in user_ids:
+            for connection in list(self.active_connections.get(user_id, ())):
+                try:
+                    connection.queue.put_nowait(payload)
+                except asyncio.QueueFull:
+                    self._handle_overflow(connection, payload)
+
+    def _handle_overflow(self, connection: ClientConnection, payload: str):
+        connection.dropped += 1
+        if self.overflow_policy == "disconnect":
+            logger.info(f"Disconnecting slow WebSocket client {connection.user_id}")
+            self.disconnect(connection)
+            asyncio.create_task(self._close_slow(connection))
+            return
+
+        # drop_oldest: клиент теряет самое старое недоставленное событие
+        connection.queue.get_nowait()
+        connection.queue.put_nowait(payload)
+
+    async def _close_slow(self, connection: ClientConnection):
+        try:
+            await connection.websocket.close(
+                code=status.WS_1013_TRY_AGAIN_LATER,
+                reason="Client is too slow"
+            )
+        except Exception:
+            pass
+
+manager = ConnectionManager(
+    create_chat_broker(),
+    batcher=ChatMessageBatcher(
+        max_batch_size=settings.CHAT_BATCH_MAX_SIZE,
+        max_delay=settings.CHAT_BATCH_MAX_DELAY_MS / 1000,
+    ) if settings.CHAT_GROUP_COMMIT else None,
+)
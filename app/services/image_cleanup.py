@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+from typing import Iterable
+
+from fastapi.logger import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config.events import PENDING_IMAGE_DELETES, image_service
+from app.config.settings import settings
+from app.dependencies.database import async_session
+from app.services.image_refs import FORGET_SQL, REFERENCED_SQL, STILL_REFERENCED_SQL
+from app.services.image_variants import image_variants
+from app.utils.background import PeriodicTask
+
+
+def _delete_files(filenames: Iterable[str], min_age: float) -> int:
+    """Удаляет оригиналы вместе с их вариантами. Блокирующий вызов"""
+    deleted = [name for name in filenames if image_service.delete_file(name, min_age)]
+    image_variants.purge(deleted)
+    return len(deleted)
+
+
+class ImageDeleter(PeriodicTask):
+    """Удаляет файлы, потерявшие последнюю ссылку, после коммита транзакции.
+
+    Имена копятся в памяти и раз в `interval` секунд удаляются пачкой в
+    отдельном потоке. Перед удалением счетчики перепроверяются: файл могли
+    загрузить заново и сослаться на него, пока он ждал в очереди. Файлы,
+    измененные меньше `min_age` секунд назад, остаются сборщику сирот.
+    """
+
+    name = "image deleter"
+
+    def __init__(self, interval: float, min_age: float):
+        super().__init__(interval)
+        self.min_age = min_age
+        self._pending: set[str] = set()
+
+    def enqueue(self, filenames: Iterable[str]) -> None:
+        self._pending.update(filenames)
+
+    async def run_once(self) -> None:
+        await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, set()
+
+        try:
+            async with async_session() as session:
+                result = await session.execute(
+                    STILL_REFERENCED_SQL, {"filenames": list(batch)}
+                )
+                batch -= set(result.scalars())
+        except Exception:
+            self._pending |= batch
+            raise
+
+        return await asyncio.to_thread(self._delete_batch, batch)
+
+    def _delete_batch(self, filenames: set[str]) -> int:
+        return _delete_files(filenames, self.min_age)
+
+    async def stop(self) -> None:
+        await super().stop()
+        await self.flush()
+
+
+class OrphanImageSweeper(PeriodicTask):
+    """Сверяет IMAGE_STORAGE со ссылками в users, orders и orders_archive.
+
+    Удаляет файлы старше `grace` секунд, на которые никто не ссылается
+    (оставшиеся после падений, каскадных удалений в базе и т.п.), и
+    недокачанные загрузки из .tmp.
+    """
+
+    name = "orphan image sweeper"
+
+    def __init__(self, interval: float, grace: float):
+        super().__init__(interval)
+        self.grace = grace
+
+    async def run_once(self) -> int:
+        candidates = await asyncio.to_thread(self._list_candidates)
+        if not candidates:
+            return 0
+
+        async with async_session() as session:
+            result = await session.execute(
+                REFERENCED_SQL, {"base_url": settings.IMAGE_BASE_URL}
+            )
+            referenced = set(result.scalars())
+            orphans = [name for name in candidates if name not in referenced]
+            if not orphans:
+                return 0
+            # Счетчики сирот неверны по определению; новая ссылка создаст строку заново
+            await session.execute(FORGET_SQL, {"filenames": orphans})
+            await session.commit()
+
+        removed = await asyncio.to_thread(_delete_files, orphans, self.grace)
+        if removed:
+            logger.info(f"{self.name}: removed {removed} unreferenced images")
+        return removed
+
+    def _list_candidates(self) -> list[str]:
+        cutoff = time.time() - self.grace
+        candidates = []
+        for entry in os.scandir(image_service.storage_path):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                candidates.append(entry.name)
+
+        for entry in os.scandir(image_service.tmp_path):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+        return candidates
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_pending_deletes(session):
+    filenames = session.info.pop(PENDING_IMAGE_DELETES, None)
+    if filenames:
+        image_deleter.enqueue(filenames)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending_deletes(session):
+    session.info.pop(PENDING_IMAGE_DELETES, None)
+
+
+image_deleter = ImageDeleter(
+    interval=settings.IMAGE_DELETE_INTERVAL,
+    min_age=settings.IMAGE_DELETE_MIN_AGE,
+)
+
+orphan_image_sweeper = OrphanImageSweeper(
+    interval=settings.IMAGE_ORPHAN_SWEEP_INTERVAL,
+    grace=settings.IMAGE_ORPHAN_GRACE,
+)
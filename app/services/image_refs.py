@@ -0,0 +1,85 @@
+from typing import Iterable
+
+# Модули моделей импортируют app.config.events, а он этот модуль: здесь только SQL
+
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Ссылки считаются пачкой: одно имя может встречаться в списке несколько раз
+ACQUIRE_SQL = text("""
+    INSERT INTO image_refs (filename, refcount)
+    SELECT filename, count(*) FROM unnest(:filenames) AS filename
+    GROUP BY filename
+    ON CONFLICT (filename) DO UPDATE
+        SET refcount = image_refs.refcount + EXCLUDED.refcount
+""").bindparams(bindparam("filenames", type_=ARRAY(String)))
+
+RELEASE_SQL = text("""
+    UPDATE image_refs r SET refcount = r.refcount - d.n
+    FROM (
+        SELECT filename, count(*) AS n FROM unnest(:filenames) AS filename
+        GROUP BY filename
+    ) d
+    WHERE r.filename = d.filename
+""").bindparams(bindparam("filenames", type_=ARRAY(String)))
+
+# Строки удаляются отдельным оператором: CTE не видит изменений соседнего UPDATE
+PRUNE_SQL = text("""
+    DELETE FROM image_refs
+    WHERE filename = ANY(:filenames) AND refcount <= 0
+    RETURNING filename
+""").bindparams(bindparam("filenames", type_=ARRAY(String)))
+
+# Имена файлов из всех таблиц, где хранятся ссылки на изображения
+_REFERENCED = """
+    SELECT regexp_replace(url, '^.*/', '') AS filename
+    FROM (
+        SELECT image_url AS url FROM users
+        UNION ALL SELECT image_url FROM orders
+        UNION ALL SELECT logo_url FROM orders
+        UNION ALL SELECT image_url FROM orders_archive
+        UNION ALL SELECT logo_url FROM orders_archive
+    ) urls
+    WHERE strpos(url, :base_url) > 0
+"""
+
+REBUILD_SQL = text(f"""
+    INSERT INTO image_refs (filename, refcount)
+    SELECT filename, count(*) FROM ({_REFERENCED}) refs GROUP BY filename
+""")
+
+REFERENCED_SQL = text(f"SELECT DISTINCT filename FROM ({_REFERENCED}) refs")
+
+# Файлы, на которые снова сослались, пока они ждали удаления
+STILL_REFERENCED_SQL = text("""
+    SELECT filename FROM image_refs
+    WHERE filename = ANY(:filenames) AND refcount > 0
+""").bindparams(bindparam("filenames", type_=ARRAY(String)))
+
+FORGET_SQL = text("""
+    DELETE FROM image_refs WHERE filename = ANY(:filenames)
+""").bindparams(bindparam("filenames", type_=ARRAY(String)))
+
+
+def acquire_images(connection, filenames: Iterable[str]) -> None:
+    """Увеличивает счетчики ссылок. connection синхронный, из событий маппера"""
+    filenames = list(filenames)
+    if filenames:
+        connection.execute(ACQUIRE_SQL, {"filenames": filenames})
+
+
+def release_images(connection, filenames: Iterable[str]) -> list[str]:
+    """Уменьшает счетчики и возвращает файлы, на которые больше никто не ссылается"""
+    filenames = list(filenames)
+    if not filenames:
+        return []
+    connection.execute(RELEASE_SQL, {"filenames": filenames})
+    return list(connection.execute(PRUNE_SQL, {"filenames": filenames}).scalars())
+
+
+async def rebuild_image_refs(session: AsyncSession, base_url: str) -> int:
+    await session.execute(text("DELETE FROM image_refs"))
+    result = await session.execute(REBUILD_SQL, {"base_url": base_url})
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,193 @@
+import asyncio
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps
+
+from app.config.settings import settings
+
+# Формат Pillow и расширение файла варианта
+FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+    "png": ("PNG", ".png"),
+}
+SOURCE_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".webp": "webp"}
+
+
+def render_variant(source: str, target: str, width: Optional[int], fmt: str) -> int:
+    """Рендер в процессе пула: уменьшает до ширины `width` и пишет атомарно"""
+    pil_format, _ = FORMATS[fmt]
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if width and width < image.width:
+            # thumbnail сохраняет пропорции и для JPEG декодирует сразу в уменьшенном масштабе
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        tmp = f"{target}.{os.getpid()}.tmp"
+        try:
+            image.save(tmp, pil_format, quality=82, optimize=True)
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+    return os.path.getsize(target)
+
+
+class ImageVariantService:
+    """Уменьшенные копии и другие форматы изображений из IMAGE_STORAGE.
+
+    Варианты рендерятся в пуле процессов и кэшируются на диске. Одновременные
+    запросы одного варианта ждут один рендер. Когда кэш превышает
+    `max_bytes`, самые давно запрошенные (по mtime) файлы удаляются до 90%
+    лимита. Каталог кэша может быть общим для нескольких воркеров:
+    учет размера сверяется с диском при каждой чистке.
+    """
+
+    def __init__(self, source_dir: Path, cache_dir: Path, max_bytes: int, workers: int):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: dict[Path, asyncio.Future] = {}
+        self._total: Optional[int] = None
+        self._eviction: Optional[asyncio.Task] = None
+
+    async def get_variant(self, name: str, width: Optional[int], fmt: Optional[str]) -> tuple[Path, str]:
+        """Возвращает путь к варианту и его media type"""
+        stem, ext = os.path.splitext(name)
+        source = self.source_dir / name
+        if Path(name).name != name or ext.lower() not in SOURCE_FORMATS:
+            raise HTTPException(404, "Image not found")
+        fmt = fmt or SOURCE_FORMATS[ext.lower()]
+        
+        target = self.cache_dir / f"{stem}.w{width or 0}{FORMATS[fmt][1]}"
+        # Вариант отдается, только пока жив оригинал
+        if await asyncio.to_thread(self._touch, target, source):
+            return target, f"image/{fmt}"
+        
+        future = self._inflight.get(target)
+        if future is None:
+            if not await asyncio.to_thread(source.is_file):
+                raise HTTPException(404, "Image not found")
+            future = asyncio.ensure_future(self._render(str(source), str(target), width, fmt))
+            self._inflight[target] = future
+            future.add_done_callback(lambda _: self._inflight.pop(target, None))
+            future.add_done_callback(self._account)
+        
+        # shield: отмена одного из ожидающих запросов не отменяет общий рендер
+        try:
+            await asyncio.shield(future)
+        except (OSError, Image.DecompressionBombError):
+            raise HTTPException(422, "Image cannot be processed")
+        except BrokenProcessPool:
+            raise HTTPException(503, "Image processing is unavailable", headers={"Retry-After": "1"})
+        return target, f"image/{fmt}"
+
+    async def _render(self, source: str, target: str, width: Optional[int], fmt: str) -> int:
+        """Рендер в пуле; если воркер пула умер (например, по OOM), пул пересоздается
+        и рендер повторяется один раз"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, render_variant, source, target, width, fmt)
+            except BrokenProcessPool:
+                self._drop_executor(executor)
+                if attempt:
+                    raise
+
+    def _account(self, future: asyncio.Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        if self._total is not None:
+            self._total += future.result()
+        if self._total is None or self._total > self.max_bytes:
+            # Одна чистка за раз; ссылка на задачу держится, пока она идет
+            if self._eviction is None or self._eviction.done():
+                self._eviction = asyncio.create_task(self._evict(), name="image variant eviction")
+
+    async def _evict(self) -> None:
+        self._total = await asyncio.to_thread(self._evict_sync)
+
+    def purge(self, filenames) -> None:
+        """Удаляет варианты удаленных оригиналов. Блокирующий вызов"""
+        for filename in filenames:
+            stem = glob.escape(os.path.splitext(filename)[0])
+            for path in glob.glob(os.path.join(glob.escape(str(self.cache_dir)), f"{stem}.w*")):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def _evict_sync(self) -> int:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return total
+        
+        low_water = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= low_water:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    @staticmethod
+    def _touch(path: Path, source: Path) -> bool:
+        """Отмечает попадание в кэш для LRU; False, если нет варианта или оригинала"""
+        if not source.is_file():
+            return False
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # fork из процесса с потоками (to_thread, asyncpg) небезопасен
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+        return self._executor
+
+    def _drop_executor(self, executor: ProcessPoolExecutor) -> None:
+        # Сломанный пул не восстанавливается; его мог уже заменить другой рендер
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_variants = ImageVariantService(
+    source_dir=settings.IMAGE_STORAGE,
+    cache_dir=settings.IMAGE_VARIANT_CACHE,
+    max_bytes=settings.IMAGE_VARIANT_CACHE_MAX_BYTES,
+    workers=settings.IMAGE_VARIANT_WORKERS,
+)
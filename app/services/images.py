@@ -1,7 +1,12 @@
+import asyncio
+import hashlib
 import os
+import time
 import uuid
 import aiofiles
+import aiofiles.os
 from pathlib import Path
+from typing import Optional
 from fastapi import UploadFile, HTTPException
 
 from app.config.settings import settings
@@ -10,7 +15,9 @@ class ImageService:
     def __init__(self):
         self.storage_path = settings.IMAGE_STORAGE
         self.base_url = settings.IMAGE_BASE_URL
-        self.storage_path.mkdir(parents=True, exist_ok=True)
+        # Недокачанные файлы лежат на том же томе, чтобы переименование было атомарным
+        self.tmp_path = self.storage_path / ".tmp"
+        self.tmp_path.mkdir(parents=True, exist_ok=True)
 
     async def save_image(self, file: UploadFile) -> str:
         # Проверка расширения
@@ -18,26 +25,61 @@ class ImageService:
         if ext not in settings.ALLOWED_EXTENSIONS:
             raise HTTPException(400, "Invalid image format")
         
-        # Проверка размера
-        if file.size > settings.MAX_FILE_SIZE:
+        # Проверка заявленного размера; у chunked-загрузок его может не быть
+        if file.size is not None and file.size > settings.MAX_FILE_SIZE:
             raise HTTPException(400, "File too large")
 
-        # Генерация уникального имени
-        filename = f"{uuid.uuid4()}{ext}"
-        file_path = self.storage_path / filename
-        
-        # Асинхронное сохранение
-        async with aiofiles.open(file_path, "wb") as buffer:
-            await buffer.write(await file.read())
+        # Копируем кусками во временный файл, считая реальный размер и хэш
+        tmp_path = self.tmp_path / f"{uuid.uuid4()}{ext}"
+        try:
+            size = 0
+            digest = hashlib.sha256()
+            async with aiofiles.open(tmp_path, "wb") as buffer:
+                while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.MAX_FILE_SIZE:
+                        raise HTTPException(400, "File too large")
+                    digest.update(chunk)
+                    await buffer.write(chunk)
+            
+            # Имя по содержимому: одинаковые загрузки хранятся одним файлом
+            filename = f"{digest.hexdigest()}{ext}"
+            file_path = self.storage_path / filename
+            try:
+                # Файл уже есть: свежий mtime защищает его от удаления как «сироты»,
+                # пока новая ссылка на него не сохранена
+                await asyncio.to_thread(os.utime, file_path)
+            except FileNotFoundError:
+                await aiofiles.os.replace(tmp_path, file_path)
+            else:
+                await aiofiles.os.remove(tmp_path)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
         
         return f"{self.base_url}/{filename}"
 
+    def filename_from_url(self, url: Optional[str]) -> Optional[str]:
+        """Имя файла в хранилище или None для внешних ссылок"""
+        if not url or not url.__contains__(self.base_url):
+            return None
+        return url.split("/")[-1]
+
     def delete_image(self, url: str) -> None:
-        if not url.__contains__(self.base_url):
-            return
-            
-        filename = url.split("/")[-1]
+        filename = self.filename_from_url(url)
+        if filename:
+            self.delete_file(filename)
+
+    def delete_file(self, filename: str, min_age: float = 0) -> bool:
+        """Удаляет файл, если он не менялся `min_age` секунд. Блокирующий вызов"""
         file_path = self.storage_path / filename
-        
-        if file_path.exists():
-            file_path.unlink()
\ No newline at end of file
+        try:
+            if min_age and time.time() - file_path.stat().st_mtime < min_age:
+                return False
+            file_path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
\ No newline at end of file
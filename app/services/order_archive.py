@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.config.settings import settings
+from app.dependencies.database import async_session
+from app.utils.background import PeriodicTask
+from app.utils.cache import order_cache
+
+ARCHIVED_COLUMNS = (
+    "id, title, description, image_url, logo_url, price, address, "
+    "begin_time, end_time, created_at, updated_at, version, user_id"
+)
+
+# Пачка заказов и их просмотров переносится одним оператором: строки удаляются
+# из orders/order_views и вставляются в архив из RETURNING. order_stats
+# удаляется каскадом; файлы изображений не трогаются, ссылки на них остаются
+# в orders_archive
+ARCHIVE_SQL = text(f"""
+    WITH moved AS (
+        DELETE FROM orders
+        WHERE id IN (
+            SELECT id FROM orders
+            WHERE end_time < :cutoff
+            ORDER BY end_time
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {ARCHIVED_COLUMNS}
+    ), moved_views AS (
+        DELETE FROM order_views v
+        USING moved m
+        WHERE v.order_id = m.id
+        RETURNING v.user_id, v.order_id, v.status
+    ), archived AS (
+        INSERT INTO orders_archive ({ARCHIVED_COLUMNS})
+        SELECT {ARCHIVED_COLUMNS} FROM moved
+        RETURNING id
+    ), archived_views AS (
+        INSERT INTO order_views_archive (user_id, order_id, status)
+        SELECT user_id, order_id, status FROM moved_views
+    )
+    SELECT id FROM archived
+""")
+
+
+class OrderArchiver(PeriodicTask):
+    """Переносит заказы, завершившиеся больше `archive_after` назад, в orders_archive"""
+
+    name = "order archiver"
+
+    def __init__(self, interval: float, archive_after: timedelta, batch_size: int):
+        super().__init__(interval)
+        self.archive_after = archive_after
+        self.batch_size = batch_size
+
+    async def run_once(self) -> int:
+        total = 0
+        while True:
+            moved = await self._archive_batch()
+            total += moved
+            if moved < self.batch_size:
+                return total
+
+    async def _archive_batch(self) -> int:
+        cutoff = datetime.now(timezone.utc) - self.archive_after
+        async with async_session() as session:
+            result = await session.execute(
+                ARCHIVE_SQL,
+                {"cutoff": cutoff, "batch_size": self.batch_size}
+            )
+            archived = result.scalars().all()
+            await session.commit()
+
+        for order_id in archived:
+            order_cache.invalidate(order_id)
+        return len(archived)
+
+
+order_archiver = OrderArchiver(
+    interval=settings.ORDER_ARCHIVE_INTERVAL,
+    archive_after=timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS),
+    batch_size=settings.ORDER_ARCHIVE_BATCH_SIZE,
+)
@@ -0,0 +1,228 @@
+import codecs
+import csv
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi.logger import logger
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.config.events import image_service
+from app.models.order import Order
+from app.schemas.orders import OrderCreate, OrderImportError, OrderImportReport
+from app.services.image_refs import ACQUIRE_SQL
+
+# Ограничение на одну запись, чтобы память не зависела от содержимого файла
+MAX_RECORD_SIZE = 64 * 1024
+
+
+class OrderImportService:
+    """Потоковый импорт заказов из NDJSON или CSV.
+
+    Строки проверяются OrderCreate и записываются пачками по `chunk_size`:
+    один многострочный INSERT и одна транзакция на пачку; пачка, которую
+    база отвергла, делится пополам до сбойных строк. Ошибочные строки
+    попадают в отчет и не прерывают импорт; если в CSV теряются границы
+    записей, импорт останавливается и возвращается отчет о сделанном.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        chunk_size: int = settings.ORDER_IMPORT_CHUNK_SIZE,
+        max_reported_errors: int = settings.ORDER_IMPORT_MAX_REPORTED_ERRORS,
+    ):
+        self.session = session
+        self.chunk_size = chunk_size
+        self.max_reported_errors = max_reported_errors
+
+    async def import_orders(
+        self,
+        user_id: UUID,
+        body: AsyncIterator[bytes],
+        fmt: str
+    ) -> OrderImportReport:
+        report = OrderImportReport()
+        records = self._parse_csv(body) if fmt == "csv" else self._parse_ndjson(body)
+        chunk: list[tuple[int, dict]] = []
+
+        async for row_number, data, error in records:
+            if error is None and not isinstance(data, dict):
+                error = "Row must be an object"
+            if error is not None:
+                self._add_error(report, row_number, [error])
+                continue
+            try:
+                order = OrderCreate.model_validate(data)
+            except ValidationError as e:
+                self._add_error(report, row_number, [
+                    f"{' → '.join(map(str, error['loc']))}: {error['msg']}"
+                    for error in e.errors()
+                ])
+                continue
+
+            chunk.append((row_number, self._to_values(order, user_id)))
+            if len(chunk) >= self.chunk_size:
+                await self._flush(chunk, report)
+                chunk = []
+
+        if chunk:
+            await self._flush(chunk, report)
+        return report
+
+    @staticmethod
+    def _to_values(order: OrderCreate, user_id: UUID) -> dict:
+        return {
+            **order.model_dump(),
+            "id": uuid.uuid4(),
+            "created_at": datetime.now(timezone.utc),
+            "user_id": user_id,
+        }
+
+    async def _flush(self, chunk: list[tuple[int, dict]], report: OrderImportReport):
+        try:
+            await self._write(chunk)
+            report.imported += len(chunk)
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            if len(chunk) == 1:
+                logger.error(f"Order import row {chunk[0][0]} failed: {e}")
+                self._add_error(report, chunk[0][0], ["Database error"])
+                return
+            # Делим пачку пополам, пока не останутся только сбойные строки
+            middle = len(chunk) // 2
+            await self._flush(chunk[:middle], report)
+            await self._flush(chunk[middle:], report)
+
+    async def _write(self, chunk: list[tuple[int, dict]]):
+        await self.session.execute(
+            insert(Order).values([values for _, values in chunk])
+        )
+        # Core-вставка минует события маппера: ссылки на изображения учитываем сами
+        filenames = [
+            name
+            for _, values in chunk
+            for name in (
+                image_service.filename_from_url(values.get("image_url")),
+                image_service.filename_from_url(values.get("logo_url")),
+            )
+            if name
+        ]
+        if filenames:
+            await self.session.execute(ACQUIRE_SQL, {"filenames": filenames})
+        await self.session.commit()
+
+    def _add_error(self, report: OrderImportReport, row_number: int, errors: list[str]):
+        report.failed += 1
+        if len(report.errors) < self.max_reported_errors:
+            report.errors.append(OrderImportError(row=row_number, errors=errors))
+        else:
+            report.errors_truncated = True
+
+    async def _iter_lines(
+        self,
+        body: AsyncIterator[bytes]
+    ) -> AsyncIterator[tuple[Optional[str], Optional[str]]]:
+        """Строки тела как (строка, None) или (None, ошибка).
+
+        Слишком длинная строка пропускается до следующего перевода строки,
+        строка не в UTF-8 отбрасывается целиком: остальные строки читаются дальше.
+        """
+        buffer = b""
+        skipping = False
+        first = True
+        async for chunk in body:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if skipping:
+                    # Хвост слишком длинной строки
+                    skipping = False
+                    continue
+                # Лимит не должен зависеть от того, как тело разбито на чанки
+                if len(line) > MAX_RECORD_SIZE:
+                    yield None, "Line too long"
+                else:
+                    yield self._decode_line(line, first)
+                first = False
+            if len(buffer) > MAX_RECORD_SIZE:
+                if not skipping:
+                    yield None, "Line too long"
+                    first = False
+                skipping = True
+                buffer = b""
+        if buffer.strip() and not skipping:
+            yield self._decode_line(buffer, first)
+
+    @staticmethod
+    def _decode_line(line: bytes, first: bool) -> tuple[Optional[str], Optional[str]]:
+        try:
+            text = line.decode("utf-8-sig" if first else "utf-8")
+        except UnicodeDecodeError:
+            return None, "Line must be UTF-8 encoded"
+        return text.rstrip("\r"), None
+
+    async def _parse_ndjson(self, body: AsyncIterator[bytes]):
+        row_number = 0
+        async for line, error in self._iter_lines(body):
+            if error is not None:
+                row_number += 1
+                yield row_number, None, error
+                continue
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line), None
+            except ValueError:
+                yield row_number, None, "Invalid JSON"
+
+    async def _parse_csv(self, body: AsyncIterator[bytes]):
+        header: Optional[list[str]] = None
+        pending: Optional[str] = None
+        row_number = 0
+
+        async for line, error in self._iter_lines(body):
+            if error is not None:
+                row_number += 1
+                # Без заголовка или посреди поля в кавычках границы записей потеряны
+                if header is None or pending is not None or error == "Line too long":
+                    yield row_number, None, f"{error}, import stopped"
+                    return
+                yield row_number, None, error
+                continue
+
+            record = line if pending is None else f"{pending}\n{line}"
+            # Нечетное число кавычек: поле в кавычках продолжается на следующей строке
+            if record.count('"') % 2:
+                if len(record) > MAX_RECORD_SIZE:
+                    yield row_number + 1, None, "Line too long, import stopped"
+                    return
+                pending = record
+                continue
+            pending = None
+            if not record.strip():
+                continue
+
+            values = next(csv.reader([record]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield row_number, {
+                name: value if value != "" else None
+                for name, value in zip(header, values)
+            }, None
+
+        if pending is not None:
+            yield row_number + 1, None, "Unterminated quoted field"
@@ -0,0 +1,120 @@
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import bindparam, case, func, or_, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order_stats import OrderStats
+
+# Эталонные агрегаты, посчитанные заново по order_views
+_COMPUTED_STATS_TEMPLATE = """
+    SELECT o.id AS order_id,
+           count(v.user_id)::int AS views_count,
+           max(v.status) AS status_priority,
+           (count(*) FILTER (WHERE v.status >= 1 AND v.status = v.max_status))::int AS connected_count
+    FROM orders o
+    LEFT JOIN (
+        SELECT order_id, user_id, status,
+               max(status) OVER (PARTITION BY order_id) AS max_status
+        FROM order_views
+        {views_filter}
+    ) v ON v.order_id = o.id
+    {orders_filter}
+    GROUP BY o.id
+"""
+_COMPUTED_STATS = _COMPUTED_STATS_TEMPLATE.format(views_filter="", orders_filter="")
+
+_UPSERT_STATS = """
+    INSERT INTO order_stats (order_id, views_count, status_priority, connected_count)
+    {computed}
+    ON CONFLICT (order_id) DO UPDATE SET
+        views_count = EXCLUDED.views_count,
+        status_priority = EXCLUDED.status_priority,
+        connected_count = EXCLUDED.connected_count
+"""
+
+REBUILD_SQL = text(_UPSERT_STATS.format(computed=_COMPUTED_STATS))
+
+# Пересчет только переданных заказов
+REFRESH_SQL = text(_UPSERT_STATS.format(computed=_COMPUTED_STATS_TEMPLATE.format(
+    views_filter="WHERE order_id = ANY(:order_ids)",
+    orders_filter="WHERE o.id = ANY(:order_ids)",
+))).bindparams(bindparam("order_ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+CHECK_SQL = text(f"""
+    SELECT c.order_id,
+           s.views_count AS stored_views_count, c.views_count,
+           s.status_priority AS stored_status_priority, c.status_priority,
+           s.connected_count AS stored_connected_count, c.connected_count
+    FROM ({_COMPUTED_STATS}) c
+    LEFT JOIN order_stats s ON s.order_id = c.order_id
+    WHERE coalesce(s.views_count, 0) <> c.views_count
+       OR s.status_priority IS DISTINCT FROM c.status_priority
+       OR coalesce(s.connected_count, 0) <> c.connected_count
+    LIMIT :limit
+""")
+
+
+async def record_view(
+    session: AsyncSession,
+    order_id: UUID,
+    created: bool,
+    new_status: Optional[int] = None
+) -> None:
+    """Учитывает новый просмотр и/или повышение статуса просмотра.
+
+    Вызывается в той же транзакции, что и изменение order_views. Статус
+    просмотра только растет, поэтому максимум и число исполнителей на нем
+    пересчитываются без обращения к order_views.
+    """
+    views_delta = 1 if created else 0
+    stmt = insert(OrderStats).values(
+        order_id=order_id,
+        views_count=views_delta,
+        status_priority=new_status,
+        connected_count=1 if new_status else 0,
+    )
+    
+    set_ = {"views_count": OrderStats.views_count + views_delta}
+    if new_status is not None:
+        set_["connected_count"] = case(
+            (
+                or_(
+                    OrderStats.status_priority.is_(None),
+                    OrderStats.status_priority < new_status
+                ),
+                1
+            ),
+            (
+                OrderStats.status_priority == new_status,
+                OrderStats.connected_count + 1
+            ),
+            else_=OrderStats.connected_count
+        )
+        set_["status_priority"] = func.greatest(OrderStats.status_priority, new_status)
+    
+    await session.execute(
+        stmt.on_conflict_do_update(index_elements=[OrderStats.order_id], set_=set_)
+    )
+
+
+async def refresh_order_stats(session: AsyncSession, order_ids: list[UUID]) -> None:
+    """Пересчитывает агрегаты заказов по order_views в текущей транзакции.
+
+    Нужен там, где просмотры удаляются не через mark_viewed: например,
+    каскадом вместе с пользователем.
+    """
+    if order_ids:
+        await session.execute(REFRESH_SQL, {"order_ids": order_ids})
+
+
+async def rebuild_order_stats(session: AsyncSession) -> int:
+    result = await session.execute(REBUILD_SQL)
+    await session.commit()
+    return result.rowcount
+
+
+async def find_inconsistent_order_stats(session: AsyncSession, limit: int = 100) -> list:
+    result = await session.execute(CHECK_SQL, {"limit": limit})
+    return result.all()
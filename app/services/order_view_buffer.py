@@ -0,0 +1,101 @@
+from uuid import UUID
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+
+from app.config.settings import settings
+from app.dependencies.database import async_session
+from app.utils.background import PeriodicTask
+from app.utils.cache import order_cache
+
+# Просмотры несуществующих (уже удаленных) заказов и пользователей отбрасываются,
+# повторные просмотры гасит ON CONFLICT; счетчики order_stats растут на число
+# реально вставленных строк
+FLUSH_SQL = text("""
+    WITH inserted AS (
+        INSERT INTO order_views (user_id, order_id)
+        SELECT v.user_id, v.order_id
+        FROM unnest(:user_ids, :order_ids) AS v(user_id, order_id)
+        JOIN orders o ON o.id = v.order_id
+        JOIN users u ON u.id = v.user_id
+        ON CONFLICT DO NOTHING
+        RETURNING order_id
+    )
+    INSERT INTO order_stats (order_id, views_count)
+    SELECT order_id, count(*) FROM inserted GROUP BY order_id
+    ON CONFLICT (order_id) DO UPDATE
+        SET views_count = order_stats.views_count + EXCLUDED.views_count
+    RETURNING order_id
+""").bindparams(
+    bindparam("user_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("order_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+)
+
+
+class OrderViewBuffer(PeriodicTask):
+    """Отложенная запись простых просмотров заказов (без смены статуса).
+
+    Просмотры копятся в памяти без повторов по (user_id, order_id) и
+    записываются одним INSERT ... ON CONFLICT DO NOTHING раз в `interval`
+    секунд и при остановке приложения.
+    """
+
+    name = "order view buffer"
+
+    def __init__(self, interval: float, max_size: int, enabled: bool = True):
+        super().__init__(interval)
+        self.max_size = max_size
+        self.enabled = enabled
+        self._pending: set[tuple[UUID, UUID]] = set()
+
+    def add(self, user_id: UUID, order_id: UUID) -> bool:
+        """Возвращает False, если буфер выключен или переполнен"""
+        if not self.enabled:
+            return False
+        key = (user_id, order_id)
+        if key in self._pending:
+            return True
+        if len(self._pending) >= self.max_size:
+            return False
+        self._pending.add(key)
+        return True
+
+    async def run_once(self) -> None:
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, set()
+        user_ids, order_ids = zip(*batch)
+
+        try:
+            async with async_session() as session:
+                result = await session.execute(
+                    FLUSH_SQL,
+                    {"user_ids": list(user_ids), "order_ids": list(order_ids)}
+                )
+                updated = result.scalars().all()
+                await session.commit()
+        except BaseException:
+            # Вернем просмотры в буфер, сколько поместится, до следующей попытки;
+            # при отмене во время остановки их допишет финальный flush в stop()
+            for key in batch:
+                if len(self._pending) >= self.max_size:
+                    break
+                self._pending.add(key)
+            raise
+
+        for order_id in updated:
+            order_cache.invalidate(order_id)
+
+    async def stop(self) -> None:
+        await super().stop()
+        await self.flush()
+
+
+order_view_buffer = OrderViewBuffer(
+    interval=settings.ORDER_VIEW_FLUSH_INTERVAL,
+    max_size=settings.ORDER_VIEW_BUFFER_SIZE,
+    enabled=settings.ORDER_VIEW_BUFFER_ENABLED,
+)
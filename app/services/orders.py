@@ -1,16 +1,62 @@
 from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy import and_, exists, func, or_, select
+from fastapi.logger import logger
+from sqlalchemy import Float, and_, false, func, literal_column, select, true, tuple_, union_all
 from sqlalchemy.orm import aliased, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.order import Order
+from app.models.order_archive import OrderArchive, OrderViewArchive
+from app.models.order_stats import OrderStats
 from app.models.order_view import OrderView
-from app.schemas.orders import OrderCreate, OrderResponse, OrderUpdate
+from app.schemas.orders import (
+    ConnectedOrdersFilter,
+    ConnectedRole,
+    OrderCreate,
+    OrderEvent,
+    OrderFeedFilter,
+    OrderResponse,
+    OrderSort,
+    OrderUpdate,
+)
+from app.services.connection_manager import manager
+from app.services.order_stats import record_view
+from app.utils.cache import order_cache
+from app.utils.etag import make_etag
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Данные заказов на русском: стемминг и стоп-слова словаря russian
+SEARCH_CONFIG = literal_column("'russian'::regconfig")
 
 class OrderService:
     STATUS_MAP = {1: "ожидание", 2: "в работе", 3: "завершен"}
+    # Сортировка ленты: колонка и направление, у каждой есть индекс (колонка, id)
+    SORT_COLUMNS = {
+        OrderSort.newest: (Order.created_at, True),
+        OrderSort.begin_time: (Order.begin_time, False),
+        OrderSort.price: (Order.price, False),
+        OrderSort.price_desc: (Order.price, True),
+    }
+    # Поля карточки в списках: строки сразу собираются в dict без ORM и pydantic
+    LIST_COLUMNS = (
+        Order.id,
+        Order.user_id,
+        Order.title,
+        Order.description,
+        Order.image_url,
+        Order.logo_url,
+        Order.price,
+        Order.address,
+        Order.begin_time,
+        Order.end_time,
+        Order.version,
+        OrderStats.views_count,
+        OrderStats.status_priority,
+        false().label("archived"),
+    )
     
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -31,10 +77,12 @@ class OrderService:
     ) -> None:
         order = await self.session.get(Order, order_id, options=[joinedload(Order.owner)])
         if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
+            raise await self._missing_order(order_id)
         
         view = await self.session.get(OrderView, (user_id, order_id))
         status_num = next((k for k, v in self.STATUS_MAP.items() if v == status), None)
+        created = view is None
+        status_changed = False
     
         if view:
             if current_user_id != order.user_id and current_user_id != view.user_id:
@@ -44,12 +92,32 @@ class OrderService:
             new_level = status_num if status_num is not None else 0
             
             if new_level >= current_level:
+                status_changed = status_num is not None and status_num != view.status
                 view.status = status_num
         else:
             view = OrderView(user_id=user_id, order_id=order_id, status=status_num)
             self.session.add(view)
+            status_changed = status_num is not None
+        
+        if created or status_changed:
+            await self.session.flush()
+            await record_view(
+                self.session,
+                order_id,
+                created=created,
+                new_status=status_num if status_changed else None
+            )
         
         await self.session.commit()
+        order_cache.invalidate(order_id)
+        
+        if status_changed:
+            await self._publish(order_id, order.user_id, OrderEvent(
+                event="order_status",
+                order_id=order_id,
+                status=self.STATUS_MAP.get(status_num),
+                user_id=user_id
+            ))
         
     async def update_order(
         self,
@@ -59,10 +127,7 @@ class OrderService:
     ) -> OrderResponse:
         order = await self.session.get(Order, order_id)
         if not order:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found"
-                )
+            raise await self._missing_order(order_id)
         if user_id != order.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -73,74 +138,329 @@ class OrderService:
             setattr(order, key, value)
         
         await self.session.commit()
+        order_cache.invalidate(order_id)
         await self.session.refresh(order)
-        return OrderResponse.model_validate(order)
+        response = OrderResponse.model_validate(order)
+        
+        await self._publish(order_id, order.user_id, OrderEvent(
+            event="order_updated",
+            order_id=order_id,
+            order=response
+        ))
+        return response
+    
+    async def _missing_order(self, order_id: UUID) -> HTTPException:
+        """404 для несуществующего заказа, 410 для перенесенного в архив: он только для чтения"""
+        archived = await self.session.scalar(
+            select(OrderArchive.id).where(OrderArchive.id == order_id)
+        )
+        if archived:
+            return HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Order is archived"
+            )
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    
+    async def _publish(self, order_id: UUID, owner_id: UUID, event: OrderEvent) -> None:
+        """Рассылает событие владельцу и исполнителям заказа, подключенным к /ws/chat"""
+        try:
+            participants = set(await self.session.scalars(
+                select(OrderView.user_id).where(
+                    and_(
+                        OrderView.order_id == order_id,
+                        OrderView.status.isnot(None)
+                    )
+                )
+            ))
+            participants.add(owner_id)
+            await manager.notify(participants, event.model_dump_json())
+        except Exception as e:
+            # Изменение уже сохранено: сбой рассылки не должен ронять запрос
+            logger.error(f"Failed to publish order event: {e}")
     
     async def get_order(self, order_id: UUID) -> OrderResponse:
-        order = await self.session.get(Order, order_id)
-        if not order:
-            raise HTTPException(status_code=404, detail="Order not found")
+        response, _ = await self.get_order_with_etag(order_id)
+        return response
+    
+    async def get_order_etag(self, order_id: UUID) -> Optional[str]:
+        """ETag заказа без загрузки самого заказа: версия строки и те же агрегаты, что в теле"""
+        stats = self._views_summary(OrderView, order_id)
+        result = await self.session.execute(
+            select(
+                Order.version,
+                stats.c.views_count,
+                stats.c.status_priority,
+                stats.c.connected_user_ids
+            ).select_from(Order).join(stats, true()).where(Order.id == order_id)
+        )
+        row = result.first()
+        if row:
+            return self._order_etag(*row)
         
-        views_count = await self.session.scalar(
-            select(func.count()).where(OrderView.order_id == order_id)
+        archived_version = await self.session.scalar(
+            select(OrderArchive.version).where(OrderArchive.id == order_id)
         )
+        return self._archived_etag(archived_version) if archived_version else None
+    
+    async def get_order_with_etag(self, order_id: UUID) -> tuple[OrderResponse, str]:
+        # ETag кэшируется вместе с ответом, чтобы не расходиться с телом
+        cached = order_cache.get(order_id)
+        if cached is not None:
+            return cached
         
-        status_priority = await self.session.scalar(
-            select(func.max(OrderView.status))
-            .where(OrderView.order_id == order_id)
+        # Заказ, счетчик просмотров, статус и исполнители одним запросом
+        stats = self._views_summary(OrderView, order_id)
+        result = await self.session.execute(
+            select(
+                Order,
+                stats.c.views_count,
+                stats.c.status_priority,
+                stats.c.connected_user_ids
+            ).select_from(Order).join(stats, true()).where(Order.id == order_id)
         )
-        status = self.STATUS_MAP.get(status_priority)
+        row = result.first()
+        if row:
+            cached = (self._order_response(*row), self._order_etag(row[0].version, *row[1:]))
+        else:
+            cached = await self._get_archived_order(order_id)
         
-        connected_user_ids = await self.session.scalars(
-            select(OrderView.user_id).where(
-                and_(
-                    OrderView.order_id == order_id,
-                    OrderView.status == status_priority,
-                    OrderView.status >= 1,
-                )
-            )
+        order_cache.set(order_id, cached)
+        return cached
+    
+    async def _get_archived_order(self, order_id: UUID) -> tuple[OrderResponse, str]:
+        stats = self._views_summary(OrderViewArchive, order_id)
+        result = await self.session.execute(
+            select(
+                OrderArchive,
+                stats.c.views_count,
+                stats.c.status_priority,
+                stats.c.connected_user_ids
+            ).join(stats, true()).where(OrderArchive.id == order_id)
         )
+        row = result.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Order not found")
+        response = self._order_response(*row)
+        response.archived = True
+        return response, self._archived_etag(row[0].version)
+    
+    @staticmethod
+    def _views_summary(view_model, order_id: UUID):
+        """Число просмотров, высший статус и исполнители с этим статусом"""
+        views = select(
+            view_model.user_id,
+            view_model.status,
+            func.max(view_model.status).over().label("status_priority")
+        ).where(view_model.order_id == order_id).subquery()
         
+        return select(
+            func.count().label("views_count"),
+            func.max(views.c.status_priority).label("status_priority"),
+            func.array_agg(views.c.user_id).filter(
+                and_(
+                    views.c.status == views.c.status_priority,
+                    views.c.status >= 1,
+                )
+            ).label("connected_user_ids")
+        ).select_from(views).subquery()
+    
+    def _order_response(self, order, views_count, status_priority, connected_user_ids) -> OrderResponse:
         response = OrderResponse.model_validate(order)
         response.views_count = views_count or 0
-        response.status = status
-        response.connected_user_ids = list(connected_user_ids)
+        response.status = self.STATUS_MAP.get(status_priority)
+        response.connected_user_ids = list(connected_user_ids or [])
         return response
     
-    async def get_all_orders(self, offset: int, limit: int) -> list[OrderResponse]:
+    async def get_all_orders(
+        self,
+        offset: int,
+        limit: int,
+        sort: OrderSort = OrderSort.newest,
+        cursor: Optional[str] = None,
+        filters: Optional[OrderFeedFilter] = None
+    ) -> tuple[list[dict], Optional[str], str]:
+        sort_column, _ = self.SORT_COLUMNS[sort]
+        stmt = self._feed_statement(
+            (*self.LIST_COLUMNS, Order.created_at),
+            offset, sort, cursor, filters
+        )
+        result = await self.session.execute(stmt.limit(limit + 1))
+        rows = result.all()
+        orders = [self._order_dict(row) for row in rows[:limit]]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(
+                sort.value, getattr(last, sort_column.key), last.id
+            )
+        
+        etag = self._page_etag(
+            [(row.id, row.version, row.views_count, row.status_priority) for row in rows],
+            limit
+        )
+        return orders, next_cursor, etag
+    
+    async def get_all_orders_etag(
+        self,
+        offset: int,
+        limit: int,
+        sort: OrderSort = OrderSort.newest,
+        cursor: Optional[str] = None,
+        filters: Optional[OrderFeedFilter] = None
+    ) -> str:
+        """ETag страницы ленты по тем же условиям, но только по id, версиям и счетчикам"""
+        stmt = self._feed_statement(
+            (Order.id, Order.version, OrderStats.views_count, OrderStats.status_priority),
+            offset, sort, cursor, filters
+        )
+        result = await self.session.execute(stmt.limit(limit + 1))
+        return self._page_etag(result.all(), limit)
+    
+    def _feed_statement(
+        self,
+        columns: tuple,
+        offset: int,
+        sort: OrderSort,
+        cursor: Optional[str],
+        filters: Optional[OrderFeedFilter]
+    ):
         current_time = datetime.now(timezone.utc) 
+        sort_column, descending = self.SORT_COLUMNS[sort]
+        stmt = select(*columns).outerjoin(
+            OrderStats, Order.id == OrderStats.order_id
+        ).where(
+            Order.end_time > current_time 
+        )
+        
+        if filters:
+            stmt = stmt.where(*self._feed_conditions(filters))
+        if sort_column is Order.price:
+            stmt = stmt.where(Order.price.isnot(None))
+        
+        if cursor:
+            cursor_sort, value, last_id = decode_cursor(
+                cursor, str, self._cursor_type(sort_column), UUID
+            )
+            if cursor_sort != sort.value:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor does not match sort order"
+                )
+            position = tuple_(sort_column, Order.id)
+            stmt = stmt.where(
+                position < tuple_(value, last_id) if descending
+                else position > tuple_(value, last_id)
+            )
+        elif offset:
+            stmt = stmt.offset(offset)
+        
+        if descending:
+            return stmt.order_by(sort_column.desc(), Order.id.desc())
+        return stmt.order_by(sort_column.asc(), Order.id.asc())
+    
+    @staticmethod
+    def _order_etag(version, views_count, status_priority, connected_user_ids) -> str:
+        # Из тех же значений, что попадают в тело ответа
+        return make_etag(
+            version,
+            views_count or 0,
+            status_priority,
+            sorted(str(user_id) for user_id in connected_user_ids or [])
+        )
+    
+    @staticmethod
+    def _archived_etag(version) -> str:
+        # Архивный заказ больше не меняется
+        return make_etag("archived", version)
+    
+    @staticmethod
+    def _page_etag(rows, limit: int) -> str:
+        # Лишняя строка limit + 1 не попадает в тело, но меняет наличие X-Next-Cursor
+        return make_etag([tuple(row) for row in rows[:limit]], len(rows) > limit)
+    
+    def _order_dict(self, row) -> dict:
+        """Карточка заказа в виде OrderResponse.model_dump() без валидации"""
+        return {
+            "title": row.title,
+            "description": row.description,
+            "image_url": row.image_url,
+            "logo_url": row.logo_url,
+            "price": float(row.price) if row.price is not None else None,
+            "address": row.address,
+            "begin_time": row.begin_time,
+            "end_time": row.end_time,
+            # asyncpg отдает свой подкласс UUID, orjson его не сериализует
+            "id": str(row.id),
+            "user_id": str(row.user_id),
+            "views_count": row.views_count or 0,
+            "status": self.STATUS_MAP.get(row.status_priority),
+            "connected_user_ids": [],
+            "archived": row.archived,
+        }
+    
+    async def search_orders(
+        self,
+        query: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> tuple[list[dict], Optional[str]]:
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(Order.search_vector, ts_query, type_=Float)
         stmt = select(
-            Order,
-            func.count(OrderView.order_id).label('views_count'),
-            func.max(OrderView.status).label('status_priority') 
+            *self.LIST_COLUMNS,
+            rank.label("rank")
         ).outerjoin(
-            OrderView, Order.id == OrderView.order_id
+            OrderStats, Order.id == OrderStats.order_id
         ).where(
-            Order.end_time > current_time 
-        ).group_by(Order.id).offset(offset).limit(limit)
-
-        result = await self.session.execute(stmt)
-        orders = []
+            Order.search_vector.bool_op("@@")(ts_query),
+            Order.end_time > datetime.now(timezone.utc)
+        )
         
-        for row in result:
-            order = row[0]
-            views_count = row[1] or 0
-            status_priority = row[2] 
-            
-            order_data = OrderResponse.model_validate(order)
-            order_data.views_count = views_count
-            order_data.status = self.STATUS_MAP.get(status_priority)
-            orders.append(order_data)
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, float, UUID)
+            stmt = stmt.where(tuple_(rank, Order.id) < tuple_(last_rank, last_id))
+        
+        result = await self.session.execute(
+            stmt.order_by(rank.desc(), Order.id.desc()).limit(limit + 1)
+        )
+        rows = result.all()
+        
+        orders = [self._order_dict(row) for row in rows[:limit]]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.rank, last.id)
+        
+        return orders, next_cursor
     
-        return orders
+    @staticmethod
+    def _feed_conditions(filters: OrderFeedFilter) -> list:
+        conditions = []
+        if filters.price_min is not None:
+            conditions.append(Order.price >= filters.price_min)
+        if filters.price_max is not None:
+            conditions.append(Order.price <= filters.price_max)
+        if filters.begins_after is not None:
+            conditions.append(Order.begin_time >= filters.begins_after)
+        if filters.ends_before is not None:
+            conditions.append(Order.end_time <= filters.ends_before)
+        if filters.owner_id is not None:
+            conditions.append(Order.user_id == filters.owner_id)
+        return conditions
+    
+    @staticmethod
+    def _cursor_type(column) -> type:
+        return Decimal if column is Order.price else datetime
     
     async def delete_order(self, order_id: UUID, user_id: UUID) -> None:
         order = await self.session.get(Order, order_id)
         if not order:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found"
-                )
+            raise await self._missing_order(order_id)
         if user_id != order.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -149,50 +469,160 @@ class OrderService:
         
         await self.session.delete(order)
         await self.session.commit()
+        order_cache.invalidate(order_id)
         
-    async def get_connected_orders(self, user_id: UUID) -> list[OrderResponse]:
-        OrderViewAll = aliased(OrderView)
-        
-        stmt = select(
-            Order,
-            func.count(OrderViewAll.order_id).label('views_count'),
-            func.max(OrderViewAll.status).label('status_priority')
-        ).outerjoin(
-            OrderViewAll, Order.id == OrderViewAll.order_id
-        ).where(
-            or_(
-                Order.user_id == user_id,
-                and_(
-                    Order.user_id != user_id,
-                    exists().where(
-                        and_(
-                            OrderView.order_id == Order.id,
-                            OrderView.user_id == user_id,
-                            OrderView.status.isnot(None)
-                        )
-                    )
-                )
-            )
-        ).group_by(Order.id)
-
-        result = await self.session.execute(stmt)
+    async def get_connected_orders(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[ConnectedOrdersFilter] = None
+    ) -> tuple[list[dict], Optional[str], str]:
+        result = await self.session.execute(
+            self._connected_statement(user_id, limit, cursor, filters)
+        )
         rows = result.all()
         
-        orders = []
-        for row in rows:
-            order = row[0]
-            views_count = row[1] or 0
-            status_priority = row[2]
-            
-            order_data = OrderResponse.model_validate(order)
-            order_data.views_count = views_count
-            order_data.status = self.STATUS_MAP.get(status_priority)
-            orders.append(order_data)
-        
-        if not orders:
+        if not rows and not cursor:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Orders not found"
             )
         
-        return orders
\ No newline at end of file
+        orders = [self._order_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        
+        return orders, next_cursor, self._connected_etag(rows, limit)
+    
+    async def get_connected_orders_etag(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[ConnectedOrdersFilter] = None
+    ) -> Optional[str]:
+        result = await self.session.execute(
+            self._connected_statement(user_id, limit, cursor, filters, light=True)
+        )
+        rows = result.all()
+        return self._connected_etag(rows, limit) if rows else None
+    
+    def _connected_etag(self, rows, limit: int) -> str:
+        return self._page_etag(
+            [
+                (row.id, row.version, row.views_count, row.status_priority, row.archived)
+                for row in rows
+            ],
+            limit
+        )
+    
+    def _connected_statement(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: Optional[str],
+        filters: Optional[ConnectedOrdersFilter],
+        light: bool = False
+    ):
+        """Свои заказы и заказы, где пользователь исполнитель, через UNION ALL.
+        
+        Для живых и архивных заказов по две ветки; каждая идет по своему индексу,
+        уже отсортирована и ограничена limit + 1, так что внешний запрос сливает
+        не больше 4 * (limit + 1) строк. Архивные заказы отдаются с archived=True.
+        light оставляет только колонки для ETag.
+        """
+        last = decode_cursor(cursor, datetime, UUID) if cursor else None
+        status_num = None
+        if filters and filters.status:
+            status_num = next(k for k, v in self.STATUS_MAP.items() if v == filters.status)
+        role = filters.role if filters else None
+        
+        archived_views = aliased(OrderViewArchive)
+        sources = (
+            (
+                Order,
+                OrderView,
+                OrderStats.views_count,
+                OrderStats.status_priority,
+                lambda stmt: stmt.outerjoin(OrderStats, Order.id == OrderStats.order_id),
+                False,
+            ),
+            (
+                OrderArchive,
+                OrderViewArchive,
+                select(func.count()).where(
+                    archived_views.order_id == OrderArchive.id
+                ).correlate(OrderArchive).scalar_subquery(),
+                select(func.max(archived_views.status)).where(
+                    archived_views.order_id == OrderArchive.id
+                ).correlate(OrderArchive).scalar_subquery(),
+                lambda stmt: stmt,
+                True,
+            ),
+        )
+        
+        branches = []
+        for model, view_model, views_count, status_priority, join_stats, archived in sources:
+            columns = self._connected_columns(model, views_count, status_priority, archived, light)
+            conditions = []
+            if last:
+                conditions.append(tuple_(model.created_at, model.id) < tuple_(*last))
+            if status_num is not None:
+                conditions.append(status_priority == status_num)
+            
+            if role in (None, ConnectedRole.owner):
+                branches.append(
+                    join_stats(select(*columns)).where(model.user_id == user_id, *conditions)
+                )
+            if role in (None, ConnectedRole.participant):
+                branches.append(
+                    join_stats(select(*columns).join(
+                        view_model,
+                        and_(
+                            view_model.order_id == model.id,
+                            view_model.user_id == user_id,
+                            view_model.status.isnot(None)
+                        )
+                    )).where(model.user_id != user_id, *conditions)
+                )
+        
+        branches = [
+            branch.order_by(
+                branch.selected_columns.created_at.desc(), branch.selected_columns.id.desc()
+            ).limit(limit + 1)
+            for branch in branches
+        ]
+        connected = union_all(*branches).subquery()
+        return select(connected).order_by(
+            connected.c.created_at.desc(), connected.c.id.desc()
+        ).limit(limit + 1)
+    
+    @staticmethod
+    def _connected_columns(model, views_count, status_priority, archived: bool, light: bool) -> tuple:
+        """Одинаковый набор колонок для заказа и архивного заказа, чтобы ветки сложились в UNION"""
+        if light:
+            fields = (model.id, model.version)
+        else:
+            fields = (
+                model.id,
+                model.user_id,
+                model.title,
+                model.description,
+                model.image_url,
+                model.logo_url,
+                model.price,
+                model.address,
+                model.begin_time,
+                model.end_time,
+                model.version,
+            )
+        return (
+            *fields,
+            views_count.label("views_count"),
+            status_priority.label("status_priority"),
+            (true() if archived else false()).label("archived"),
+            model.created_at,
+        )
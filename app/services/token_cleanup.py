@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, or_, select
+
+from app.config.settings import settings
+from app.dependencies.database import async_session
+from app.models.token import RefreshToken
+from app.utils.background import PeriodicTask
+
+
+class RefreshTokenSweeper(PeriodicTask):
+    """Удаляет истекшие и отозванные refresh-токены пачками"""
+
+    name = "refresh token sweeper"
+
+    def __init__(self, interval: float, batch_size: int):
+        super().__init__(interval)
+        self.batch_size = batch_size
+
+    async def run_once(self) -> int:
+        total = 0
+        while True:
+            deleted = await self._delete_batch()
+            total += deleted
+            if deleted < self.batch_size:
+                return total
+
+    async def _delete_batch(self) -> int:
+        batch = select(RefreshToken.id).where(
+            or_(
+                RefreshToken.expires_at < datetime.now(timezone.utc),
+                RefreshToken.revoked == True
+            )
+        ).limit(self.batch_size).with_for_update(skip_locked=True)
+
+        async with async_session() as session:
+            result = await session.execute(
+                delete(RefreshToken).where(RefreshToken.id.in_(batch))
+            )
+            await session.commit()
+        return result.rowcount
+
+
+refresh_token_sweeper = RefreshTokenSweeper(
+    interval=settings.REFRESH_SWEEP_INTERVAL,
+    batch_size=settings.REFRESH_SWEEP_BATCH_SIZE,
+)
@@ -1,20 +1,26 @@
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
+from app.models.order_view import OrderView
 from app.models.user import User
 from app.schemas.users import UserCreate, UserResponse, UserUpdate
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.utils.security import get_password_hash
+from app.services.order_stats import refresh_order_stats
+from app.utils.cache import order_cache, user_cache
+from app.utils.etag import make_etag
+from app.utils.security import get_password_hash_async
 
 class UserService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create_user(self, user_data: UserCreate) -> UserResponse:
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         new_user = User(
             **user_data.model_dump(exclude={"company_id","password"}),
             company_id=user_data.company_id,
@@ -26,6 +32,17 @@ class UserService:
         return UserResponse.model_validate(new_user)
     
     async def get_user(self, user_id: UUID) -> UserResponse:
+        response, _, _ = await self.get_user_with_etag(user_id)
+        return response
+    
+    async def get_user_etag(self, user_id: UUID) -> Optional[tuple[str, datetime]]:
+        result = await self.session.execute(
+            select(User.version, User.updated_at).where(User.id == user_id)
+        )
+        row = result.first()
+        return (make_etag(row.version), row.updated_at) if row else None
+    
+    async def get_user_with_etag(self, user_id: UUID) -> tuple[UserResponse, str, datetime]:
         stmt = select(User).where(User.id == user_id).options(
             selectinload(User.company)
         )
@@ -33,7 +50,7 @@ class UserService:
         user = result.scalar_one_or_none()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        return UserResponse.model_validate(user)
+        return UserResponse.model_validate(user), make_etag(user.version), user.updated_at
     
     async def update_user(
         self,
@@ -46,12 +63,13 @@ class UserService:
         
         for key, value in user_data.model_dump(exclude_unset=True).items():
             if key == "password" and value:
-                hashed_password = get_password_hash(value)
+                hashed_password = await get_password_hash_async(value)
                 setattr(user, key, hashed_password)
             elif key != "password" and key != "phone":
                 setattr(user, key, value)
         
         await self.session.commit()
+        user_cache.invalidate(str(user_id))
         await self.session.refresh(user)
         return UserResponse.model_validate(user)
     
@@ -60,5 +78,15 @@ class UserService:
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
+        # Просмотры пользователя удалятся вместе с ним: агрегаты этих заказов
+        # пересчитываются в той же транзакции
+        viewed_order_ids = list(await self.session.scalars(
+            select(OrderView.order_id).where(OrderView.user_id == user_id)
+        ))
         await self.session.delete(user)
-        await self.session.commit()
\ No newline at end of file
+        await self.session.flush()
+        await refresh_order_stats(self.session, viewed_order_ids)
+        await self.session.commit()
+        user_cache.invalidate(str(user_id))
+        for order_id in viewed_order_ids:
+            order_cache.invalidate(order_id)
\ No newline at end of file
@@ -0,0 +1,128 @@
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.config.settings import settings
+
+DEFAULT_KID = "default"
+
+class KeyRing:
+    """Набор ключей JWT, разобранных один раз на процесс.
+
+    Ключ по умолчанию берется из JWT_PRIVATE_KEY/JWT_PUBLIC_KEY (или
+    keys/jwt_*.pem). Для ротации в каталог ключей кладутся файлы
+    <kid>.private.pem и <kid>.public.pem; ключ с одним лишь публичным файлом
+    используется только для проверки ранее выданных токенов.
+    """
+
+    def __init__(self, keys_dir: Path, algorithm: str, reload_interval: float):
+        self.keys_dir = keys_dir
+        self.algorithm = algorithm
+        self.reload_interval = reload_interval
+        self._signers: dict[str, Key] = {}
+        self._verifiers: dict[str, Key] = {}
+        self._active_kid: Optional[str] = None
+        self._snapshot: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        signers: dict[str, Key] = {}
+        verifiers: dict[str, Key] = {}
+        private_mtimes: dict[str, float] = {}
+
+        if settings.JWT_PRIVATE_KEY and settings.JWT_PUBLIC_KEY:
+            signers[DEFAULT_KID] = self._construct(settings.JWT_PRIVATE_KEY)
+            verifiers[DEFAULT_KID] = self._construct(settings.JWT_PUBLIC_KEY)
+
+        snapshot = self._scan()
+        for name, mtime in snapshot:
+            kid, _, kind = name[:-len(".pem")].rpartition(".")
+            if not kid or kind not in ("private", "public"):
+                continue
+            key = self._construct((self.keys_dir / name).read_text())
+            if kind == "private":
+                signers[kid] = key
+                private_mtimes[kid] = mtime
+            else:
+                verifiers[kid] = key
+
+        for kid, key in signers.items():
+            verifiers.setdefault(kid, key.public_key())
+        if not signers:
+            raise FileExistsError("keys files not found")
+
+        active_kid = settings.JWT_ACTIVE_KID
+        if active_kid not in signers:
+            rotated = {kid: m for kid, m in private_mtimes.items() if kid in signers}
+            active_kid = max(rotated, key=rotated.get) if rotated else DEFAULT_KID
+
+        self._signers = signers
+        self._verifiers = verifiers
+        self._active_kid = active_kid
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+
+    def _construct(self, pem: str) -> Key:
+        return jwk.construct(pem, algorithm=self.algorithm)
+
+    def _scan(self) -> tuple:
+        if not self.keys_dir.is_dir():
+            return ()
+        return tuple(sorted(
+            (path.name, path.stat().st_mtime)
+            for path in self.keys_dir.glob("*.*.pem")
+        ))
+
+    def maybe_reload(self, min_interval: Optional[float] = None) -> None:
+        """Перечитывает каталог ключей, если он изменился с прошлой проверки"""
+        if min_interval is None:
+            min_interval = self.reload_interval
+        now = time.monotonic()
+        if self._active_kid is not None and now - self._checked_at < min_interval:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            if self._active_kid is None or self._scan() != self._snapshot:
+                self._load()
+
+    def signing_key(self) -> tuple[str, Key]:
+        self.maybe_reload()
+        return self._active_kid, self._signers[self._active_kid]
+
+    def encode(self, claims: dict) -> str:
+        kid, key = self.signing_key()
+        return jwt.encode(
+            claims,
+            key,
+            algorithm=self.algorithm,
+            headers={"kid": kid}
+        )
+
+    def decode(self, token: str) -> dict:
+        kid = jwt.get_unverified_header(token).get("kid") or DEFAULT_KID
+        key = self._verifiers.get(kid)
+        if key is None:
+            # Токен мог быть подписан новым ключом другим воркером
+            self.maybe_reload(min_interval=1.0)
+            key = self._verifiers.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+
+key_ring = KeyRing(
+    keys_dir=settings.JWT_KEYS_DIR,
+    algorithm=settings.JWT_ALGORITHM,
+    reload_interval=settings.JWT_KEYS_RELOAD_INTERVAL,
+)
@@ -0,0 +1,49 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+# Курсор следующей страницы отдается в заголовке, тело ответа остается списком
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_LOADERS = {
+    datetime: datetime.fromisoformat,
+    UUID: UUID,
+    Decimal: Decimal,
+}
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Разбирает курсор, приводя значения к указанным типам"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor length mismatch")
+        return tuple(
+            None if value is None else _LOADERS.get(type_, type_)(value)
+            for value, type_ in zip(values, types)
+        )
+    except (ValueError, TypeError, ArithmeticError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def set_next_cursor(headers, cursor: Optional[str]) -> None:
+    if cursor:
+        headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,18 @@
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+class FastJSONResponse(Response):
+    """JSON-ответ через orjson для уже подготовленных данных.
+
+    Возвращенный из обработчика объект Response FastAPI не валидирует
+    повторно по response_model, поэтому содержимое должно быть собрано
+    из доверенных строк базы: dict/list, строки, datetime, числа. UUID из
+    asyncpg приводятся к str заранее: orjson не принимает подклассы uuid.UUID.
+    Даты в UTC пишутся с суффиксом Z, как у pydantic.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
@@ -0,0 +1,79 @@
+"""Задержка OrderService.get_order: четыре запроса против одного.
+
+Берет до --orders заказов из базы и для каждого режима делает --iterations
+вызовов, печатая p50/p99:
+
+    python -m scripts.bench_get_order --iterations 2000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import and_, func, select
+
+from app.dependencies.database import async_session, engine
+from app.models.order import Order
+from app.models.order_view import OrderView
+from app.schemas.orders import OrderResponse
+from app.services.orders import OrderService
+from app.utils.cache import order_cache
+
+async def get_order_before(session, order_id):
+    """Прежняя реализация: четыре отдельных запроса"""
+    order = await session.get(Order, order_id)
+    views_count = await session.scalar(
+        select(func.count()).where(OrderView.order_id == order_id)
+    )
+    status_priority = await session.scalar(
+        select(func.max(OrderView.status)).where(OrderView.order_id == order_id)
+    )
+    connected_user_ids = await session.scalars(
+        select(OrderView.user_id).where(
+            and_(
+                OrderView.order_id == order_id,
+                OrderView.status == status_priority,
+                OrderView.status >= 1,
+            )
+        )
+    )
+    response = OrderResponse.model_validate(order)
+    response.views_count = views_count or 0
+    response.status = OrderService.STATUS_MAP.get(status_priority)
+    response.connected_user_ids = list(connected_user_ids)
+    return response
+
+async def get_order_after(session, order_id, cached: bool):
+    if not cached:
+        order_cache.invalidate(order_id)
+    return await OrderService(session).get_order(order_id)
+
+async def run(label, call, order_ids, iterations):
+    timings = []
+    for _ in range(iterations):
+        order_id = random.choice(order_ids)
+        async with async_session() as session:
+            started = time.perf_counter()
+            await call(session, order_id)
+            timings.append((time.perf_counter() - started) * 1000)
+    q = statistics.quantiles(timings, n=100)
+    print(f"{label:>16}: p50={q[49]:.3f}ms p99={q[98]:.3f}ms")
+
+async def main(orders: int, iterations: int):
+    async with async_session() as session:
+        order_ids = list(await session.scalars(select(Order.id).limit(orders)))
+    if not order_ids:
+        raise SystemExit("No orders in the database")
+
+    await run("before", get_order_before, order_ids, iterations)
+    await run("after, no cache", lambda s, i: get_order_after(s, i, False), order_ids, iterations)
+    await run("after, cached", lambda s, i: get_order_after(s, i, True), order_ids, iterations)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.iterations))
@@ -0,0 +1,69 @@
+"""Пиковая память ImageService.save_image при параллельных загрузках.
+
+Эмулирует --uploads одновременных загрузок по --size-mb мегабайт: тело каждой
+лежит во временном файле на диске, как у UploadFile после разбора multipart.
+Сравнивает прежнее чтение файла целиком с потоковым копированием и печатает
+пик аллокаций Python по tracemalloc:
+
+    python -m scripts.bench_image_upload --uploads 100 --size-mb 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.services.images import ImageService
+
+def make_upload(size: int) -> UploadFile:
+    body = tempfile.TemporaryFile()
+    chunk = os.urandom(1024 * 1024)
+    for _ in range(size // len(chunk)):
+        body.write(chunk)
+    body.seek(0)
+    # size=None, как у chunked-загрузки без Content-Length части
+    return UploadFile(file=body, filename="upload.jpg")
+
+async def save_before(service: ImageService, file: UploadFile) -> None:
+    """Прежняя реализация: весь файл в памяти перед записью"""
+    file_path = service.storage_path / f"{uuid.uuid4()}.jpg"
+    async with aiofiles.open(file_path, "wb") as buffer:
+        await buffer.write(await file.read())
+
+async def save_after(service: ImageService, file: UploadFile) -> None:
+    await service.save_image(file)
+
+async def run(label: str, save, service: ImageService, uploads: int, size: int):
+    files = [make_upload(size) for _ in range(uploads)]
+    tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(save(service, file) for file in files))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for file in files:
+        await file.close()
+    print(f"{label:>7}: peak={peak / 2**20:8.1f} MiB time={elapsed:.2f}s")
+
+async def main(uploads: int, size_mb: int):
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as storage:
+        service = ImageService()
+        service.storage_path = Path(storage)
+        service.tmp_path = Path(storage) / ".tmp"
+        service.tmp_path.mkdir()
+        await run("before", save_before, service, uploads, size)
+        await run("after", save_after, service, uploads, size)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=100)
+    parser.add_argument("--size-mb", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.uploads, args.size_mb))
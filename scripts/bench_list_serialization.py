@@ -0,0 +1,103 @@
+"""Сериализация страницы ленты: pydantic + response_model против dict + orjson.
+
+Строки генерируются в памяти, база не нужна. Для страниц по 20, 200 и 2000
+заказов печатает пропускную способность в строках в секунду:
+
+    python -m scripts.bench_list_serialization --iterations 200
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from asyncpg.pgproto.pgproto import UUID as PgUUID
+from pydantic import TypeAdapter
+
+from app.schemas.orders import OrderResponse
+from app.services.orders import OrderService
+from app.utils.responses import FastJSONResponse
+
+PAGE_SIZES = (20, 200, 2000)
+
+response_adapter = TypeAdapter(list[OrderResponse])
+
+def pg_uuid() -> PgUUID:
+    # Такие UUID приходят из asyncpg: подкласс uuid.UUID, который orjson не принимает
+    return PgUUID(str(uuid.uuid4()))
+
+def make_rows(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=pg_uuid(),
+            user_id=pg_uuid(),
+            title=f"Заказ {i}",
+            description="Описание заказа " * 8,
+            image_url=f"https://example.com/storage/images/{uuid.uuid4()}.jpg",
+            logo_url=None,
+            price=Decimal("1500.00") + i,
+            address="г. Москва, ул. Тверская, д. 1",
+            begin_time=now + timedelta(days=1),
+            end_time=now + timedelta(days=7),
+            version=1,
+            views_count=i % 50,
+            status_priority=i % 4 or None,
+            archived=False,
+        )
+        for i in range(count)
+    ]
+
+def before(rows) -> bytes:
+    """Прежний путь: model_validate на строку, повторная проверка по response_model и json"""
+    orders = []
+    for row in rows:
+        order = OrderResponse.model_validate(row)
+        order.views_count = row.views_count or 0
+        order.status = OrderService.STATUS_MAP.get(row.status_priority)
+        orders.append(order)
+    content = response_adapter.dump_python(
+        response_adapter.validate_python(orders), mode="json"
+    )
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+def after(service: OrderService, rows) -> bytes:
+    return FastJSONResponse([service._order_dict(row) for row in rows]).body
+
+def same_content(left: bytes, right: bytes) -> bool:
+    # Pydantic в зависимости от версии пишет UTC как +00:00 или Z: даты сравниваются как значения
+    def parse(body: bytes) -> list:
+        return [
+            {
+                key: datetime.fromisoformat(value) if key in ("begin_time", "end_time") else value
+                for key, value in order.items()
+            }
+            for order in json.loads(body)
+        ]
+    return parse(left) == parse(right)
+
+def measure(label: str, call, rows, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call(rows)
+    rate = len(rows) * iterations / (time.perf_counter() - started)
+    print(f"{label:>8} {len(rows):>5} rows: {rate:>12,.0f} rows/s")
+    return rate
+
+def main(iterations: int):
+    service = OrderService(session=None)
+    for size in PAGE_SIZES:
+        rows = make_rows(size)
+        assert same_content(before(rows), after(service, rows))
+        runs = max(1, iterations * PAGE_SIZES[0] // size)
+        slow = measure("before", before, rows, runs)
+        fast = measure("after", lambda r: after(service, r), rows, runs)
+        print(f"{'':>8} speedup x{fast / slow:.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,103 @@
+"""Бенчмарк полнотекстового поиска заказов на синтетических данных.
+
+Создает пользователя и --rows заказов (по умолчанию миллион) со случайными
+русскими словами, затем замеряет OrderService.search_orders для набора
+запросов, включая переход на следующую страницу по курсору:
+
+    python -m scripts.bench_order_search --rows 1000000
+
+С флагом --cleanup синтетические данные удаляются после замера.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, text
+
+from app.dependencies.database import async_session, engine
+from app.models.user import User
+from app.services.orders import OrderService
+
+WORDS = [
+    "ремонт", "квартиры", "кровли", "фасада", "отделка", "штукатурка", "плитка",
+    "монтаж", "электрики", "сантехники", "демонтаж", "стяжка", "пола", "окон",
+    "дверей", "утепление", "покраска", "стен", "потолка", "фундамента",
+    "забора", "бани", "дома", "гаража", "кладка", "кирпича", "бетона",
+    "срочно", "недорого", "бригада", "сварка", "отопления", "вентиляции",
+]
+STREETS = ["Ленина", "Мира", "Гагарина", "Советская", "Садовая", "Лесная"]
+
+SEED_SQL = text("""
+    INSERT INTO orders (id, title, description, address, price, begin_time, end_time, user_id)
+    SELECT gen_random_uuid(),
+           w[1 + floor(random() * n)::int] || ' ' || w[1 + floor(random() * n)::int],
+           w[1 + floor(random() * n)::int] || ' ' || w[1 + floor(random() * n)::int] || ' ' ||
+           w[1 + floor(random() * n)::int] || ' ' || w[1 + floor(random() * n)::int],
+           'ул. ' || s[1 + floor(random() * 6)::int] || ', ' || (1 + floor(random() * 200)::int),
+           round((1000 + random() * 100000)::numeric, 2),
+           now(),
+           now() + interval '30 days',
+           :user_id
+    FROM generate_series(1, :rows),
+         (SELECT CAST(:words AS text[]) AS w, cardinality(CAST(:words AS text[])) AS n,
+                 CAST(:streets AS text[]) AS s) AS dict
+""")
+
+QUERIES = ["ремонт", "ремонт квартиры", "монтаж отопления", "покраска -фасада", "Ленина", "бетон кладка"]
+
+async def seed(rows: int) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    async with async_session() as session:
+        session.add(User(id=user_id, fio="Search Benchmark", password="-", address="-"))
+        await session.flush()
+        for start in range(0, rows, 100_000):
+            await session.execute(SEED_SQL, {
+                "user_id": user_id,
+                "rows": min(100_000, rows - start),
+                "words": WORDS,
+                "streets": STREETS,
+            })
+        await session.commit()
+        await session.execute(text("ANALYZE orders"))
+    return user_id
+
+async def measure(query: str, iterations: int, limit: int) -> None:
+    first, second = [], []
+    for _ in range(iterations):
+        async with async_session() as session:
+            service = OrderService(session)
+            started = time.perf_counter()
+            _, cursor = await service.search_orders(query, limit)
+            first.append((time.perf_counter() - started) * 1000)
+            if cursor:
+                started = time.perf_counter()
+                await service.search_orders(query, limit, cursor)
+                second.append((time.perf_counter() - started) * 1000)
+    line = f"{query!r:>24}: page 1 p50={statistics.median(first):.1f}ms max={max(first):.1f}ms"
+    if second:
+        line += f", page 2 p50={statistics.median(second):.1f}ms"
+    print(line)
+
+async def main(args):
+    started = time.perf_counter()
+    user_id = await seed(args.rows)
+    print(f"Seeded {args.rows} orders in {time.perf_counter() - started:.0f}s")
+    try:
+        for query in QUERIES:
+            await measure(query, args.iterations, args.limit)
+    finally:
+        if args.cleanup:
+            async with async_session() as session:
+                await session.execute(delete(User).where(User.id == user_id))
+                await session.commit()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--cleanup", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""Бенчмарк поиска refresh-токена: 512-символьный токен против sha256.
+
+Создает две временные UNLOGGED-таблицы со схемой до и после перехода на
+token_hash, заполняет их --rows строками и замеряет задержку поиска:
+
+    python -m scripts.bench_refresh_tokens --rows 10000000 --lookups 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config.settings import settings
+
+SETUP = [
+    "DROP TABLE IF EXISTS bench_refresh_old, bench_refresh_new",
+    """CREATE UNLOGGED TABLE bench_refresh_old (
+        id bigint PRIMARY KEY,
+        token varchar(512) UNIQUE NOT NULL,
+        expires_at timestamptz NOT NULL
+    )""",
+    """CREATE UNLOGGED TABLE bench_refresh_new (
+        id bigint PRIMARY KEY,
+        token_hash bytea UNIQUE NOT NULL,
+        expires_at timestamptz NOT NULL
+    )""",
+    """INSERT INTO bench_refresh_old
+        SELECT i, repeat(md5(i::text), 6), now() + interval '7 days'
+        FROM generate_series(1, :rows) AS i""",
+    """INSERT INTO bench_refresh_new
+        SELECT i, sha256(convert_to(repeat(md5(i::text), 6), 'UTF8')), now() + interval '7 days'
+        FROM generate_series(1, :rows) AS i""",
+    "ANALYZE bench_refresh_old",
+    "ANALYZE bench_refresh_new",
+]
+
+def make_token(i: int) -> str:
+    return hashlib.md5(str(i).encode()).hexdigest() * 6
+
+async def measure(conn, stmt, params: list[dict]) -> list[float]:
+    timings = []
+    for p in params:
+        started = time.perf_counter()
+        await conn.execute(stmt, p)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def report(label: str, timings: list[float]) -> None:
+    q = statistics.quantiles(timings, n=100)
+    print(f"{label:>8}: p50={q[49]:.3f}ms p99={q[98]:.3f}ms")
+
+async def main(rows: int, lookups: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as conn:
+        for stmt in SETUP:
+            await conn.execute(text(stmt), {"rows": rows})
+        await conn.commit()
+
+        size = await conn.execute(text(
+            "SELECT pg_size_pretty(pg_indexes_size('bench_refresh_old')), "
+            "pg_size_pretty(pg_indexes_size('bench_refresh_new'))"
+        ))
+        old_size, new_size = size.one()
+        print(f"rows={rows} index size: old={old_size} new={new_size}")
+
+        ids = [random.randint(1, rows) for _ in range(lookups)]
+        old = await measure(
+            conn,
+            text("SELECT id FROM bench_refresh_old WHERE token = :token"),
+            [{"token": make_token(i)} for i in ids]
+        )
+        new = await measure(
+            conn,
+            text("SELECT id FROM bench_refresh_new WHERE token_hash = :token_hash"),
+            [{"token_hash": hashlib.sha256(make_token(i).encode()).digest()} for i in ids]
+        )
+        report("before", old)
+        report("after", new)
+
+        await conn.execute(text("DROP TABLE bench_refresh_old, bench_refresh_new"))
+        await conn.commit()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.lookups))
@@ -0,0 +1,101 @@
+"""Перевод IMAGE_STORAGE на имена по содержимому (sha256 + расширение).
+
+Для каждого файла со старым (uuid) именем считается хэш. Если файла с таким
+именем еще нет, создается жесткая ссылка на старый файл. Затем в одной
+транзакции ссылки в users, orders и orders_archive переписываются на новые
+имена, а image_refs пересчитывается заново. Старые имена удаляются только
+после коммита. Запускать при остановленных загрузках:
+
+    python -m scripts.dedupe_images --dry-run
+    python -m scripts.dedupe_images
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.config.settings import settings
+from app.dependencies.database import async_session, engine
+from app.services.image_refs import rebuild_image_refs
+
+CONTENT_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z]+$")
+CHUNK_SIZE = 1024 * 1024
+
+# (таблица, колонка) со ссылками на изображения
+URL_COLUMNS = (
+    ("users", "image_url"),
+    ("orders", "image_url"),
+    ("orders", "logo_url"),
+    ("orders_archive", "image_url"),
+    ("orders_archive", "logo_url"),
+)
+
+def rename_sql(table: str, column: str):
+    return text(f"""
+        UPDATE {table} t
+        SET {column} = left(t.{column}, length(t.{column}) - length(m.old_name)) || m.new_name
+        FROM unnest(:old_names, :new_names) AS m(old_name, new_name)
+        WHERE t.{column} LIKE '%/' || m.old_name
+    """).bindparams(
+        bindparam("old_names", type_=ARRAY(String)),
+        bindparam("new_names", type_=ARRAY(String)),
+    )
+
+def content_name(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return f"{digest.hexdigest()}{path.suffix.lower()}"
+
+def plan(storage: Path) -> dict[str, str]:
+    """Старое имя -> имя по содержимому для всех файлов, которые нужно перевести"""
+    renames = {}
+    for entry in os.scandir(storage):
+        if not entry.is_file() or CONTENT_NAME.match(entry.name):
+            continue
+        renames[entry.name] = content_name(Path(entry.path))
+    return renames
+
+async def main(dry_run: bool) -> None:
+    storage = settings.IMAGE_STORAGE
+    renames = await asyncio.to_thread(plan, storage)
+    unique = len(set(renames.values()))
+    print(f"{len(renames)} files to rename, {len(renames) - unique} duplicates")
+    if dry_run or not renames:
+        return
+
+    for old_name, new_name in renames.items():
+        target = storage / new_name
+        if not target.exists():
+            os.link(storage / old_name, target)
+
+    try:
+        async with async_session() as session:
+            params = {
+                "old_names": list(renames),
+                "new_names": list(renames.values()),
+            }
+            for table, column in URL_COLUMNS:
+                result = await session.execute(rename_sql(table, column), params)
+                print(f"{table}.{column}: {result.rowcount} rows updated")
+            # rebuild_image_refs коммитит и переименования, и новые счетчики
+            refs = await rebuild_image_refs(session, settings.IMAGE_BASE_URL)
+            print(f"image_refs rebuilt: {refs} files referenced")
+    finally:
+        await engine.dispose()
+
+    for old_name in renames:
+        (storage / old_name).unlink()
+    print(f"Removed {len(renames)} old names")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
@@ -0,0 +1,46 @@
+"""Обслуживание таблицы order_stats.
+
+    python -m scripts.order_stats rebuild   # пересчитать агрегаты по order_views
+    python -m scripts.order_stats check     # найти расхождения (код выхода 1)
+"""
+import argparse
+import asyncio
+import sys
+
+from app.dependencies.database import async_session, engine
+from app.services.order_stats import find_inconsistent_order_stats, rebuild_order_stats
+
+async def rebuild() -> int:
+    async with async_session() as session:
+        count = await rebuild_order_stats(session)
+    print(f"Rebuilt stats for {count} orders")
+    return 0
+
+async def check(limit: int) -> int:
+    async with async_session() as session:
+        rows = await find_inconsistent_order_stats(session, limit)
+    for row in rows:
+        print(
+            f"{row.order_id}: views {row.stored_views_count} != {row.views_count}, "
+            f"status {row.stored_status_priority} != {row.status_priority}, "
+            f"connected {row.stored_connected_count} != {row.connected_count}"
+        )
+    if rows:
+        print(f"Found {len(rows)} inconsistent orders (limit {limit}), run 'rebuild' to fix")
+        return 1
+    print("order_stats is consistent")
+    return 0
+
+async def main(args) -> int:
+    try:
+        if args.command == "rebuild":
+            return await rebuild()
+        return await check(args.limit)
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--limit", type=int, default=100)
+    sys.exit(asyncio.run(main(parser.parse_args())))
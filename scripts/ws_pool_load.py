@@ -0,0 +1,82 @@
+"""Нагрузочный тест: занятость соединений БД при росте числа сокетов чата.
+
+Открывает все больше соединений с /ws/chat (по умолчанию 50, 100, 200, 400),
+каждый сокет периодически отправляет сообщение, а скрипт снимает число
+серверных соединений приложения из pg_stat_activity:
+
+    python -m scripts.ws_pool_load --url ws://localhost:8000/ws/chat \\
+        --token <access_token> --recipient <user_id>
+
+При сессии на действие число соединений должно оставаться в пределах
+пула и не расти вместе с количеством сокетов.
+"""
+import argparse
+import asyncio
+import json
+import random
+
+import websockets
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config.settings import settings
+
+ACTIVITY = text("""
+    SELECT count(*) AS total,
+           count(*) FILTER (WHERE state = 'idle in transaction') AS idle_in_tx
+    FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+""")
+
+async def client(url: str, recipient: str, interval: float, stop: asyncio.Event):
+    async with websockets.connect(url) as ws:
+        while not stop.is_set():
+            await ws.send(json.dumps({
+                "action": "send",
+                "recipient_id": recipient,
+                "content": "load test"
+            }))
+            try:
+                while True:
+                    await asyncio.wait_for(ws.recv(), timeout=0.01)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(interval * random.uniform(0.5, 1.5))
+
+async def main(args):
+    engine = create_async_engine(settings.DATABASE_URL)
+    url = f"{args.url}?token={args.token}"
+    stop = asyncio.Event()
+    clients: list[asyncio.Task] = []
+
+    print(f"{'sockets':>8} {'db conns':>9} {'idle in tx':>11}")
+    for target in args.steps:
+        while len(clients) < target:
+            clients.append(asyncio.create_task(
+                client(url, args.recipient, args.interval, stop)
+            ))
+        await asyncio.sleep(args.settle)
+
+        peak_total = peak_idle = 0
+        async with engine.connect() as conn:
+            for _ in range(args.samples):
+                row = (await conn.execute(ACTIVITY)).one()
+                peak_total = max(peak_total, row.total)
+                peak_idle = max(peak_idle, row.idle_in_tx)
+                await asyncio.sleep(0.5)
+        print(f"{target:>8} {peak_total:>9} {peak_idle:>11}")
+
+    stop.set()
+    await asyncio.gather(*clients, return_exceptions=True)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="ws://localhost:8000/ws/chat")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--recipient", required=True)
+    parser.add_argument("--steps", type=int, nargs="+", default=[50, 100, 200, 400])
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--settle", type=float, default=5.0)
+    parser.add_argument("--samples", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))